@@ -1,11 +1,30 @@
-from simulador_controlador import SimuladorControlador
+from simulador_controlador import ExportadorDatos, SimuladorControlador, SimuladorSinGUI
+import argparse
 import logging
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Simulador de lazos de control PID")
+    parser.add_argument('--perfilar', action='store_true',
+                        help="Captura un perfil desde el arranque hasta el cierre de la aplicación")
+    parser.add_argument('--sin-gui', action='store_true',
+                        help="Simula sin interfaz gráfica y exporta todas las señales")
+    parser.add_argument('--sistema', help="Sistema del catálogo a simular sin interfaz gráfica")
+    parser.add_argument('--duracion', type=float, default=600.0,
+                        help="Tiempo simulado en segundos sin interfaz gráfica (por defecto 600)")
+    parser.add_argument('--formato', choices=ExportadorDatos.formatos_disponibles(), default='npz',
+                        help="Formato del archivo exportado sin interfaz gráfica (por defecto npz)")
+    args = parser.parse_args()
+
     # Configurar logging a nivel INFO
     logging.basicConfig(level=logging.INFO)
+    if args.sin_gui:
+        SimuladorSinGUI(args.sistema).ejecutar(args.duracion, args.formato, args.perfilar)
+        return
+
     simulador = SimuladorControlador()
+    if args.perfilar:
+        simulador.iniciar_perfilado()
     simulador.ejecutar()
 
 
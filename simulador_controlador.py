@@ -1,27 +1,222 @@
 import yaml
 import logging
-from typing import Any
+from typing import Any, Callable
 import datetime
+import math
 import threading
 import queue
 import sys
 import os
-from collections import deque
+import json
+import tempfile
+import csv
+import re
+import importlib.util
+from itertools import islice
+from collections import Counter, deque
 import numpy as np
-from customtkinter import CTk, CTkButton, CTkEntry, CTkLabel, CTkComboBox, CTkFrame, CTkTabview, CTkSlider, CTkSwitch, CTkRadioButton, BooleanVar, StringVar, set_appearance_mode, set_default_color_theme
+from customtkinter import CTk, CTkButton, CTkEntry, CTkLabel, CTkComboBox, CTkFrame, CTkTabview, CTkSlider, CTkSwitch, CTkRadioButton, CTkInputDialog, BooleanVar, StringVar, set_appearance_mode, set_default_color_theme
 from tkinter.messagebox import showerror, askyesno
+from tkinter.filedialog import askopenfilename
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.ticker import AutoMinorLocator, MultipleLocator
-from pandas import DataFrame
+from pandas import DataFrame, read_csv, to_datetime
+from openpyxl import Workbook, load_workbook
+from scipy.optimize import minimize_scalar
+from scipy.signal import fftconvolve, lfilter
 from pyAutoControl.PIDController import PIDController
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+class CatalogoProcesos:
+    """Catálogo validado de procesos leído desde process.yaml.
+
+    Una entrada es un proceso FOPDT (Kp, taup, td, y0, ysp0, co0) o, si tiene la clave
+    'topologia', un conjunto de procesos y controladores interconectados (ver Topologia).
+
+    El resultado del parseo y la validación se guarda en un archivo de caché asociado a la
+    fecha de modificación y al tamaño del YAML, de modo que el arranque no vuelve a parsearlo
+    mientras no cambie. La caché es JSON (no se ejecuta código al leerla) y cada proceso se
+    guarda como texto JSON propio que solo se decodifica al usarlo.
+    """
+    CLAVES = ('Kp', 'taup', 'td', 'y0', 'ysp0', 'co0')
+    VERSION_CACHE = 3
+    LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.ruta_cache = ruta + '.cache'
+        self.nombres: list[str] = []
+        self._firma = None
+        self._entradas: dict[str, str] = {}
+        self._procesos: dict[str, dict[str, Any]] = {}
+
+    def __getitem__(self, nombre: str) -> dict[str, Any]:
+        if nombre not in self._procesos:
+            self._procesos[nombre] = json.loads(self._entradas[nombre])
+        return self._procesos[nombre]
+
+    def __contains__(self, nombre: object) -> bool:
+        return nombre in self._entradas
+
+    def __iter__(self):
+        return iter(self.nombres)
+
+    def __len__(self) -> int:
+        return len(self.nombres)
+
+    @classmethod
+    def validar(cls, params: Any) -> dict[str, Any]:
+        """Valida la entrada de un proceso y la devuelve como diccionario; lanza ValueError si no es válida."""
+        if not isinstance(params, dict):
+            raise ValueError("la entrada debe ser un diccionario de parámetros")
+        if 'topologia' in params:
+            Topologia.validar(params['topologia'])
+            return dict(params)
+        faltantes = [clave for clave in cls.CLAVES if clave not in params]
+        if faltantes:
+            raise ValueError(f"faltan las claves {', '.join(faltantes)}")
+        for clave in cls.CLAVES:
+            valor = params[clave]
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not math.isfinite(valor):
+                raise ValueError(f"'{clave}' debe ser numérico (se encontró {valor!r})")
+        if params['taup'] <= 0:
+            raise ValueError("'taup' debe ser mayor que cero")
+        if params['td'] < 0:
+            raise ValueError("'td' no puede ser negativo")
+        return dict(params)
+
+    def _firma_archivo(self) -> tuple[int, int]:
+        estado = os.stat(self.ruta)
+        return estado.st_mtime_ns, estado.st_size
+
+    def cargar(self) -> None:
+        """Carga el catálogo desde la caché si sigue vigente o, si no, parseando y validando el YAML."""
+        firma = self._firma_archivo()
+        datos = self._leer_cache(firma)
+        if datos is None:
+            datos = self._parsear()
+            self._escribir_cache(firma, datos)
+        else:
+            logging.info(f"Catálogo de procesos cargado desde la caché {self.ruta_cache}")
+        self._usar(datos, firma)
+
+    def cargar_respaldo(self, contenido: dict[str, Any]) -> None:
+        """Usa un catálogo en memoria sin modificar el archivo, que se recargará cuando cambie."""
+        try:
+            firma = self._firma_archivo()
+        except OSError:
+            firma = None
+        self._usar(self._validar_contenido(contenido), firma)
+
+    def archivo_vacio(self) -> bool:
+        """Indica si el archivo no tiene contenido YAML (vacío o solo comentarios)."""
+        try:
+            with open(self.ruta, 'r') as file:
+                return yaml.load(file, Loader=self.LOADER) is None
+        except (OSError, yaml.YAMLError):
+            return False
+
+    def _usar(self, datos: dict[str, Any], firma: tuple[int, int] | None) -> None:
+        for nombre, error in datos['errores'].items():
+            logging.warning(f"Proceso '{nombre}' descartado de {self.ruta}: {error}")
+
+        self._firma = firma
+        self._entradas = datos['entradas']
+        self._procesos = {}
+        # Se conserva la misma lista para que quienes la referencian vean los cambios
+        self.nombres[:] = datos['nombres']
+
+    def recargar_si_cambio(self) -> bool:
+        """Recarga el catálogo si el archivo cambió; ante un archivo inválido conserva el catálogo anterior."""
+        try:
+            firma = self._firma_archivo()
+        except OSError:
+            return False
+        if firma == self._firma:
+            return False
+        try:
+            self.cargar()
+        except (OSError, yaml.YAMLError, ValueError) as e:
+            self._firma = firma
+            logging.warning(f"No se recargó {self.ruta}: {e}")
+            return False
+        logging.info(f"Catálogo de procesos recargado: {len(self.nombres)} procesos")
+        return True
+
+    def _parsear(self) -> dict[str, Any]:
+        """Parsea y valida el YAML, separando las entradas válidas de las descartadas."""
+        with open(self.ruta, 'r') as file:
+            contenido = yaml.load(file, Loader=self.LOADER)
+        if not contenido:
+            raise ValueError("Archivo vacío")
+        if not isinstance(contenido, dict):
+            raise ValueError("El archivo debe contener un diccionario de procesos")
+        datos = self._validar_contenido(contenido)
+        logging.info(f"Configuración cargada desde {self.ruta}")
+        return datos
+
+    def _validar_contenido(self, contenido: dict[str, Any]) -> dict[str, Any]:
+        """Valida cada entrada, separando las válidas de las descartadas."""
+        nombres, entradas, errores = [], {}, {}
+        for nombre, params in contenido.items():
+            nombre = str(nombre)
+            try:
+                entradas[nombre] = json.dumps(self.validar(params), default=str, ensure_ascii=False)
+                nombres.append(nombre)
+            except ValueError as e:
+                errores[nombre] = str(e)
+        if not nombres:
+            detalle = '; '.join(f"{nombre}: {error}" for nombre, error in errores.items())
+            raise ValueError(f"El archivo no contiene procesos válidos ({detalle})")
+        return {'nombres': nombres, 'entradas': entradas, 'errores': errores}
+
+    def _leer_cache(self, firma: tuple[int, int]) -> dict[str, Any] | None:
+        try:
+            with open(self.ruta_cache, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(cache, dict) or cache.get('version') != self.VERSION_CACHE or
+                cache.get('firma') != list(firma) or not isinstance(cache.get('datos'), dict)):
+            return None
+        datos = cache['datos']
+        if (not isinstance(datos.get('nombres'), list) or not isinstance(datos.get('errores'), dict) or
+                not isinstance(datos.get('entradas'), dict) or
+                not all(isinstance(datos['entradas'].get(nombre), str) for nombre in datos['nombres'])):
+            return None
+        return datos
+
+    def _escribir_cache(self, firma: tuple[int, int], datos: dict[str, Any]) -> None:
+        """Escribe la caché en un archivo temporal y lo reemplaza de forma atómica, de modo que varias
+        instancias que arrancan a la vez sobre un catálogo compartido nunca lean una caché a medias."""
+        ruta_temporal = None
+        try:
+            descriptor, ruta_temporal = tempfile.mkstemp(prefix=os.path.basename(self.ruta_cache) + '.',
+                                                         suffix='.tmp', dir=os.path.dirname(self.ruta_cache) or '.')
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                json.dump({'version': self.VERSION_CACHE, 'firma': list(firma), 'datos': datos}, file, ensure_ascii=False)
+            os.replace(ruta_temporal, self.ruta_cache)
+        except OSError as e:
+            logging.warning(f"No se pudo escribir la caché {self.ruta_cache}: {e}")
+            if ruta_temporal is not None and os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+
 class Configuracion:
     """Clase para manejara las configuraciones del simulador"""
     CONFIG_FILE = 'config.yaml'
     PROCESS_FILE = 'process.yaml'
+    PROCESOS_DEFAULT = {
+        'Personalizado': {
+            'Kp': 4.59,
+            'taup': 15.14,
+            'td': 0.0,
+            'y0': 50,
+            'ysp0': 50,
+            'co0': 50
+        }
+    }
 
     @staticmethod
     def get_resource_path(filename: str) -> str:
@@ -34,6 +229,7 @@ class Configuracion:
     def __init__(self):
         logging.info("Cargando configuración...")
         self.configuracion = self.cargar_configuracion()
+        self.error_procesos = None
         self.process_params = self.cargar_procesos()
         logging.info("Configuración cargada exitosamente.")
         
@@ -81,45 +277,835 @@ class Configuracion:
             yaml.dump(nueva_config, file, default_flow_style=False)
             logging.info(f"Configuración actualizada y guardada en {config_file}")
     
-    def cargar_procesos(self) -> dict[str, Any]:
-        """Carga los parámetros de los procesos"""
+    def cargar_procesos(self) -> CatalogoProcesos:
+        """Carga el catálogo validado de los parámetros de los procesos"""
         process_file = self.get_resource_path(self.PROCESS_FILE)
+        catalogo = CatalogoProcesos(process_file)
         try:
-            with open(process_file, 'r') as file:
-                process_params = yaml.safe_load(file)
-                if process_params is None:
-                        raise ValueError("Archivo vacío")
-                logging.info(f"Configuración cargada desde {process_file}")
-        except (FileNotFoundError, yaml.YAMLError, ValueError):
-            logging.warning(f"Archivo {process_file} no válido o no encontrado. Generando default.")
-            self.crear_procesos_default()
-            with open(self.get_resource_path(self.PROCESS_FILE), 'r') as file:
-                process_params = yaml.safe_load(file)
-
-        self.process_names = []
-        for process_name, params in process_params.items():
-            self.process_names.append(process_name)
+            catalogo.cargar()
+        except (FileNotFoundError, yaml.YAMLError, ValueError) as e:
+            if isinstance(e, FileNotFoundError) or catalogo.archivo_vacio():
+                logging.warning(f"Archivo {process_file} vacío o no encontrado. Generando default.")
+                self.crear_procesos_default()
+                catalogo.cargar()
+            else:
+                # El archivo no se sobrescribe: puede ser un catálogo compartido con muchos modelos
+                self.error_procesos = f"{process_file}: {e}"
+                logging.error(f"Archivo {process_file} no válido; se usa el proceso por defecto sin modificarlo: {e}")
+                catalogo.cargar_respaldo(self.PROCESOS_DEFAULT)
 
-        return process_params
+        self.process_names = catalogo.nombres
+        return catalogo
 
     def crear_procesos_default(self) -> None:
         """Crea y guarda un archivo de procesos con una configuración por defecto."""
-        process_default = {
-            'Personalizado':{
-                'Kp': 4.59,
-                'taup': 15.14,
-                'td': 0.0,
-                'y0': 50,
-                'ysp0': 50,
-                'co0': 50
-            }
-        }
         process_file = self.get_resource_path(self.PROCESS_FILE)
         with open(process_file, 'w') as file:
-            yaml.dump(process_default, file, default_flow_style=False)
+            yaml.dump(self.PROCESOS_DEFAULT, file, default_flow_style=False)
             logging.info(f"Configuración por defecto creada y guardada en {process_file}")
 
+    def agregar_proceso(self, nombre: str, params: dict[str, float]) -> None:
+        """Agrega un proceso nuevo al final del archivo de procesos sin reescribir las entradas existentes."""
+        if nombre in self.process_params:
+            raise ValueError(f"Ya existe un proceso llamado '{nombre}'")
+        CatalogoProcesos.validar(params)
+
+        process_file = self.get_resource_path(self.PROCESS_FILE)
+        with open(process_file, 'r') as file:
+            contenido = file.read()
+        separador = '' if not contenido else ('\n' if contenido.endswith('\n') else '\n\n')
+        with open(process_file, 'a') as file:
+            file.write(separador)
+            yaml.dump({nombre: params}, file, default_flow_style=False, sort_keys=False, allow_unicode=True)
+
+        self.process_params.cargar()
+        logging.info(f"Proceso '{nombre}' agregado a {process_file}")
+
+class Topologia:
+    """Motor de simulación de varios modelos FOPDT y controladores PID interconectados.
+
+    Permite lazos en cascada (el set point de un controlador es la salida de otro) y
+    prealimentación de perturbaciones medidas. Todos los bloques avanzan juntos con
+    operaciones vectorizadas de NumPy, de modo que el costo de cada paso en Python no crece
+    con la cantidad de bloques. Cada controlador se ejecuta con su propio Ts, redondeado a un
+    múltiplo del paso base del motor, y mantiene su salida entre ejecuciones.
+
+    Los controladores usan la forma paralela CO = co0 + Kc*e + Ki*∫e dt + Kd*de/dt, con
+    integración condicional como corrección anti-windup.
+    """
+    CLAVES_PROCESO = ('Kp', 'taup', 'td', 'y0')
+    CLAVES_CONTROLADOR = ('pv', 'sp', 'Kc', 'Ki', 'Kd')
+
+    def __init__(self, especificacion: dict[str, Any], Ts: float):
+        self._leer(especificacion, Ts)
+        self.alfa = np.exp(-Ts / self.taup)
+        self.retardo = (self.td / Ts).astype(int)
+        self.reiniciar()
+
+    @classmethod
+    def validar(cls, especificacion: Any, Ts: float = 1.0) -> None:
+        """Valida una especificación sin reservar los buffers de la simulación; lanza ValueError si no es válida."""
+        try:
+            cls.__new__(cls)._leer(especificacion, Ts)
+        except (TypeError, AttributeError) as e:
+            raise ValueError(f"topología inválida: {e}") from e
+
+    def _leer(self, especificacion: dict[str, Any], Ts: float) -> None:
+        """Valida la especificación y arma las matrices de parámetros y conexiones."""
+        if Ts <= 0:
+            raise ValueError("el paso de simulación 'Ts' debe ser mayor que cero")
+        self.Ts = Ts
+        procesos = self._seccion(especificacion, 'procesos', requerida=True)
+        controladores = self._seccion(especificacion, 'controladores', requerida=True)
+        perturbaciones = self._seccion(especificacion, 'perturbaciones')
+        entradas = self._seccion(especificacion, 'entradas', requerida=True)
+        grafica = self._seccion(especificacion, 'grafica')
+
+        self.procesos = [str(nombre) for nombre in procesos]
+        self.controladores = [str(nombre) for nombre in controladores]
+        self.perturbaciones = [str(nombre) for nombre in perturbaciones]
+        fuentes = self.controladores + self.procesos + self.perturbaciones
+        if len(set(fuentes)) != len(fuentes):
+            raise ValueError("los nombres de procesos, controladores y perturbaciones deben ser únicos")
+        indice_fuente = {nombre: i for i, nombre in enumerate(fuentes)}
+        indice_proceso = {nombre: i for i, nombre in enumerate(self.procesos)}
+        indice_controlador = {nombre: i for i, nombre in enumerate(self.controladores)}
+        indice_perturbacion = {nombre: i for i, nombre in enumerate(self.perturbaciones)}
+        n_p, n_c, n_m = len(self.procesos), len(self.controladores), len(self.perturbaciones)
+
+        # Procesos
+        for nombre, params in procesos.items():
+            self._validar_numericos(f"proceso '{nombre}'", params, self.CLAVES_PROCESO)
+            if params['taup'] <= 0 or params['td'] < 0:
+                raise ValueError(f"proceso '{nombre}': 'taup' debe ser mayor que cero y 'td' no negativo")
+        self.Kp = np.array([procesos[p]['Kp'] for p in procesos], dtype=float)
+        self.taup = np.array([procesos[p]['taup'] for p in procesos], dtype=float)
+        self.td = np.array([procesos[p]['td'] for p in procesos], dtype=float)
+        self.y_inicial = np.array([procesos[p]['y0'] for p in procesos], dtype=float)
+
+        # Perturbaciones: valor inicial de cada una
+        for nombre, valor in perturbaciones.items():
+            self._validar_numericos(f"perturbación '{nombre}'", {'valor': valor}, ('valor',))
+        self.d_inicial = np.array(list(perturbaciones.values()), dtype=float)
+
+        # Controladores
+        self.Kc = np.zeros(n_c)
+        self.Ki = np.zeros(n_c)
+        self.Kd = np.zeros(n_c)
+        self.Ts_c = np.zeros(n_c)
+        self.co_inicial = np.zeros(n_c)
+        self.co_min = np.zeros(n_c)
+        self.co_max = np.zeros(n_c)
+        self.antiwindup = np.ones(n_c, dtype=bool)
+        self.idx_pv = np.zeros(n_c, dtype=int)
+        self.idx_sp = np.zeros(n_c, dtype=int)
+        self.sp_cascada = np.zeros(n_c, dtype=bool)
+        self.sp_inicial = np.zeros(n_c)
+        self.F = np.zeros((n_c, n_m))
+        for i, (nombre, params) in enumerate(controladores.items()):
+            contexto = f"controlador '{nombre}'"
+            if not isinstance(params, dict) or any(clave not in params for clave in self.CLAVES_CONTROLADOR):
+                raise ValueError(f"{contexto}: debe definir {', '.join(self.CLAVES_CONTROLADOR)}")
+            opciones = {'Ts': Ts, 'co0': 50.0, 'co_min': 0.0, 'co_max': 100.0}
+            opciones.update({clave: params[clave] for clave in opciones if clave in params})
+            self._validar_numericos(contexto, {**params, **opciones}, ('Kc', 'Ki', 'Kd') + tuple(opciones))
+            if opciones['Ts'] <= 0:
+                raise ValueError(f"{contexto}: 'Ts' debe ser mayor que cero")
+            if opciones['co_min'] >= opciones['co_max']:
+                raise ValueError(f"{contexto}: 'co_min' debe ser menor que 'co_max'")
+            if params['pv'] not in indice_proceso:
+                raise ValueError(f"{contexto}: 'pv' debe ser uno de los procesos")
+            self.Kc[i], self.Ki[i], self.Kd[i] = params['Kc'], params['Ki'], params['Kd']
+            self.Ts_c[i] = max(1, round(opciones['Ts'] / Ts)) * Ts
+            self.co_inicial[i] = opciones['co0']
+            self.co_min[i], self.co_max[i] = opciones['co_min'], opciones['co_max']
+            self.antiwindup[i] = bool(params.get('antiwindup', True))
+            self.idx_pv[i] = indice_proceso[params['pv']]
+            if isinstance(params['sp'], str):
+                if params['sp'] not in indice_controlador or params['sp'] == nombre:
+                    raise ValueError(f"{contexto}: 'sp' debe ser un número o el nombre de otro controlador")
+                self.sp_cascada[i] = True
+                self.idx_sp[i] = indice_controlador[params['sp']]
+            else:
+                self._validar_numericos(contexto, params, ('sp',))
+                self.sp_inicial[i] = params['sp']
+            for perturbacion, ganancia in (params.get('prealimentacion') or {}).items():
+                if perturbacion not in indice_perturbacion:
+                    raise ValueError(f"{contexto}: la prealimentación '{perturbacion}' no es una perturbación definida")
+                self._validar_numericos(contexto, {'prealimentacion': ganancia}, ('prealimentacion',))
+                self.F[i, indice_perturbacion[perturbacion]] = ganancia
+        self.razon = np.rint(self.Ts_c / Ts).astype(int)
+
+        # Entradas de cada proceso como combinación lineal de salidas de controladores, procesos y perturbaciones
+        self.W = np.zeros((n_p, len(fuentes)))
+        for nombre in self.procesos:
+            conexiones = entradas.get(nombre)
+            if conexiones is None:
+                raise ValueError(f"proceso '{nombre}': falta su entrada en 'entradas'")
+            if isinstance(conexiones, str):
+                conexiones = {conexiones: 1.0}
+            for fuente, peso in conexiones.items():
+                if fuente not in indice_fuente:
+                    raise ValueError(f"proceso '{nombre}': la entrada '{fuente}' no existe")
+                self._validar_numericos(f"proceso '{nombre}'", {'peso': peso}, ('peso',))
+                self.W[indice_proceso[nombre], indice_fuente[fuente]] = peso
+
+        # Señales graficadas: por defecto la PV y el SP del primer controlador y la CO del último
+        ysp = grafica.get('ysp', self.controladores[0])
+        co = grafica.get('co', self.controladores[-1])
+        if ysp not in indice_controlador or co not in indice_controlador:
+            raise ValueError("'grafica': 'ysp' y 'co' deben ser controladores")
+        if self.sp_cascada[indice_controlador[ysp]]:
+            raise ValueError("'grafica': el controlador de 'ysp' debe tener un set point fijo")
+        self.i_sp = indice_controlador[ysp]
+        self.i_co = indice_controlador[co]
+        y = grafica.get('y', self.procesos[self.idx_pv[self.i_sp]])
+        if y not in indice_proceso:
+            raise ValueError("'grafica': 'y' debe ser un proceso")
+        self.i_y = indice_proceso[y]
+
+        self.columnas = (['t'] + [f'y_{p}' for p in self.procesos] +
+                         [f'sp_{c}' for c in self.controladores] + [f'co_{c}' for c in self.controladores])
+        self.indices_grafica = [0, 1 + self.i_y, 1 + n_p + self.i_sp, 1 + n_p + n_c + self.i_co]
+        self._filas = np.arange(n_p)
+        self._multitasa = bool(np.any(self.razon > 1))
+        self._esclavos = np.flatnonzero(self.sp_cascada)
+        self._maestros = self.idx_sp[self._esclavos]
+        self._fuentes = np.zeros(len(fuentes))
+        self._sl_co = slice(0, n_c)
+        self._sl_y = slice(n_c, n_c + n_p)
+        self._sl_d = slice(n_c + n_p, len(fuentes))
+
+    @staticmethod
+    def _seccion(especificacion: Any, clave: str, requerida: bool = False) -> dict[str, Any]:
+        if not isinstance(especificacion, dict):
+            raise ValueError("la topología debe ser un diccionario")
+        seccion = especificacion.get(clave)
+        if seccion is None and not requerida:
+            return {}
+        if not isinstance(seccion, dict) or not seccion:
+            raise ValueError(f"la topología debe definir '{clave}'")
+        return seccion
+
+    @staticmethod
+    def _validar_numericos(contexto: str, params: Any, claves: tuple[str, ...]) -> None:
+        if not isinstance(params, dict):
+            raise ValueError(f"{contexto}: debe ser un diccionario de parámetros")
+        for clave in claves:
+            valor = params.get(clave)
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not math.isfinite(valor):
+                raise ValueError(f"{contexto}: '{clave}' debe ser numérico (se encontró {valor!r})")
+
+    def reiniciar(self) -> None:
+        """Lleva todos los bloques al estado estacionario inicial."""
+        self.k = 0
+        self.y = self.y_inicial.copy()
+        self.co = self.co_inicial.copy()
+        self.d = self.d_inicial.copy()
+        self.sp = self.sp_inicial.copy()
+        self.sp_actual = self.sp.copy()
+        self.sp_actual[self._esclavos] = self.co[self._maestros]
+        self.auto = np.ones(len(self.controladores), dtype=bool)
+        self._todos_auto = True
+        self.co_manual = self.co_inicial.copy()
+        error = self.sp_actual - self.y[self.idx_pv]
+        self.e_prev = error
+        self.integral = -self.Kc * error
+        self.u_inicial = self.W @ np.concatenate((self.co, self.y, self.d))
+        self._u_hist = np.tile(self.u_inicial[:, None], (1, self.retardo.max(initial=0) + 1))
+        self._pos = 0
+
+    def _paso(self) -> None:
+        """Avanza un paso base: primero los controladores que tocan en este paso y luego los procesos."""
+        self.k += 1
+        sp = self.sp.copy()
+        sp[self._esclavos] = self.co[self._maestros]
+        if not self._todos_auto:
+            # Un esclavo fuera de automático fija su SP en su PV y su maestro sigue esa PV
+            esclavos_manual = self._esclavos[~self.auto[self._esclavos]]
+            sp[esclavos_manual] = self.y[self.idx_pv[esclavos_manual]]
+        error = sp - self.y[self.idx_pv]
+        prealimentacion = self.F @ (self.d - self.d_inicial) if self.perturbaciones else 0.0
+        integral = self.integral + self.Ki * self.Ts_c * error
+        derivativo = self.Kd / self.Ts_c * (error - self.e_prev)
+        co = self.co_inicial + self.Kc * error + integral + derivativo + prealimentacion
+        co_limitada = np.minimum(np.maximum(co, self.co_min), self.co_max)
+        saturada = self.antiwindup & (co_limitada != co)
+        if saturada.any():
+            integral = np.where(saturada, self.integral, integral)
+        if not self._todos_auto:
+            # En manual, y en el maestro de un esclavo en manual, la integral sigue a la CO fijada
+            # para que el retorno a automático sea sin salto y el maestro no acumule windup
+            fija = ~self.auto
+            co_fija = self.co_manual.copy()
+            maestros = self.idx_sp[esclavos_manual]
+            seguimiento = self.auto[maestros]
+            fija[maestros[seguimiento]] = True
+            co_fija[maestros[seguimiento]] = sp[esclavos_manual[seguimiento]]
+            co_fija = np.minimum(np.maximum(co_fija, self.co_min), self.co_max)
+            integral = np.where(fija, co_fija - self.co_inicial - self.Kc * error - prealimentacion, integral)
+            co_limitada = np.where(fija, co_fija, co_limitada)
+
+        if self._multitasa:
+            activos = self.k % self.razon == 0
+            self.co = np.where(activos, co_limitada, self.co)
+            self.integral = np.where(activos, integral, self.integral)
+            self.e_prev = np.where(activos, error, self.e_prev)
+            self.sp_actual = np.where(activos, sp, self.sp_actual)
+        else:
+            self.co, self.integral, self.e_prev, self.sp_actual = co_limitada, integral, error, sp
+
+        self._fuentes[self._sl_co] = self.co
+        self._fuentes[self._sl_y] = self.y
+        self._fuentes[self._sl_d] = self.d
+        self._pos = (self._pos + 1) % self._u_hist.shape[1]
+        self._u_hist[:, self._pos] = self.W @ self._fuentes
+        u = self._u_hist[self._filas, (self._pos - self.retardo) % self._u_hist.shape[1]]
+        y_eq = self.y_inicial + self.Kp * (u - self.u_inicial)
+        self.y = y_eq + (self.y - y_eq) * self.alfa
+
+    def estado_actual(self) -> np.ndarray:
+        """Devuelve la fila [t, y..., sp..., co...] del estado actual."""
+        return np.concatenate(([self.k * self.Ts], self.y, self.sp_actual, self.co))
+
+    def avanzar(self, n_pasos: int, varianza: float = 0.0) -> np.ndarray:
+        """Avanza n_pasos y devuelve una fila [t, y..., sp..., co...] por paso."""
+        n_p, n_c = len(self.procesos), len(self.controladores)
+        salida = np.empty((n_pasos, len(self.columnas)))
+        ruido = np.random.normal(1, np.sqrt(varianza), (n_pasos, n_p)) if varianza > 0 else None
+        for i in range(n_pasos):
+            self._paso()
+            if ruido is not None:
+                self.y *= ruido[i]
+            fila = salida[i]
+            fila[1:1 + n_p] = self.y
+            fila[1 + n_p:1 + n_p + n_c] = self.sp_actual
+            fila[1 + n_p + n_c:] = self.co
+        salida[:, 0] = (self.k - n_pasos + 1 + np.arange(n_pasos)) * self.Ts
+        return salida
+
+    def valores_grafica(self) -> tuple[float, float, float]:
+        """Devuelve los valores actuales de y, ysp y CO graficados."""
+        fila = self.estado_actual()[self.indices_grafica]
+        return float(fila[1]), float(fila[2]), float(fila[3])
+
+    def parametros_principales(self) -> tuple[float, float, float]:
+        """Devuelve Kp del proceso graficado y la mayor constante de tiempo y el mayor tiempo muerto."""
+        return float(self.Kp[self.i_y]), float(self.taup.max()), float(self.td.max())
+
+    def fijar_sp(self, valor: float) -> None:
+        """Fija el set point del controlador graficado (siempre de set point fijo)."""
+        self.sp[self.i_sp] = valor
+
+    def fijar_ganancias(self, Kc: float, Ki: float, Kd: float) -> None:
+        """Fija las ganancias del controlador graficado en ysp."""
+        self.Kc[self.i_sp], self.Ki[self.i_sp], self.Kd[self.i_sp] = Kc, Ki, Kd
+
+    def fijar_modo(self, automatico: bool) -> None:
+        """Cambia entre automático y manual el controlador cuya CO se grafica."""
+        if not automatico and self.auto[self.i_co]:
+            self.co_manual[self.i_co] = self.co[self.i_co]
+        self.auto[self.i_co] = automatico
+        self._todos_auto = bool(self.auto.all())
+
+    def fijar_co(self, valor: float) -> None:
+        """Fija la CO manual del controlador cuya CO se grafica."""
+        self.co_manual[self.i_co] = valor
+
+    def fijar_perturbacion(self, nombre: str, valor: float) -> None:
+        """Fija el valor de una perturbación medida."""
+        self.d[self.perturbaciones.index(nombre)] = valor
+
+class NivelHistorico:
+    """Nivel del historiador que guarda mínimo, máximo y media por intervalos de ancho fijo."""
+
+    def __init__(self, ancho: float, capacidad: int, n_senales: int):
+        self.ancho = ancho
+        self.capacidad = capacidad
+        self.cobertura = ancho * capacidad
+        self.minimos = np.zeros((capacidad, n_senales))
+        self.maximos = np.zeros((capacidad, n_senales))
+        self.medias = np.zeros((capacidad, n_senales))
+        self.n_guardados = 0
+        self.siguiente = 0
+        # Intervalo abierto: aún recibe muestras y no se ha guardado en el buffer circular
+        self._intervalo = None
+        self._min = None
+        self._max = None
+        self._suma = None
+        self._conteo = 0
+
+    def agregar(self, datos: np.ndarray) -> None:
+        """Agrega un lote de muestras (filas [t, señales...]) ordenado en el tiempo."""
+        if len(datos) == 0:
+            return
+        intervalos = np.floor(datos[:, 0] / self.ancho).astype(np.int64)
+        inicios = np.concatenate(([0], np.flatnonzero(np.diff(intervalos)) + 1))
+        conteos = np.diff(np.append(inicios, len(datos)))
+        ids = intervalos[inicios]
+        minimos = np.minimum.reduceat(datos, inicios, axis=0)
+        maximos = np.maximum.reduceat(datos, inicios, axis=0)
+        sumas = np.add.reduceat(datos, inicios, axis=0)
+
+        if self._intervalo is not None:
+            if ids[0] == self._intervalo:
+                minimos[0] = np.minimum(minimos[0], self._min)
+                maximos[0] = np.maximum(maximos[0], self._max)
+                sumas[0] += self._suma
+                conteos[0] += self._conteo
+            else:
+                self._guardar(self._min[None], self._max[None], (self._suma / self._conteo)[None])
+
+        if len(ids) > 1:
+            self._guardar(minimos[:-1], maximos[:-1], sumas[:-1] / conteos[:-1, None])
+
+        self._intervalo = ids[-1]
+        self._min = minimos[-1]
+        self._max = maximos[-1]
+        self._suma = sumas[-1]
+        self._conteo = conteos[-1]
+
+    def _guardar(self, minimos: np.ndarray, maximos: np.ndarray, medias: np.ndarray) -> None:
+        """Escribe intervalos cerrados en el buffer circular descartando los más antiguos."""
+        n = len(medias)
+        if n > self.capacidad:
+            minimos, maximos, medias = minimos[-self.capacidad:], maximos[-self.capacidad:], medias[-self.capacidad:]
+            self.siguiente = (self.siguiente + n - self.capacidad) % self.capacidad
+            n = self.capacidad
+        posiciones = (self.siguiente + np.arange(n)) % self.capacidad
+        self.minimos[posiciones] = minimos
+        self.maximos[posiciones] = maximos
+        self.medias[posiciones] = medias
+        self.siguiente = (self.siguiente + n) % self.capacidad
+        self.n_guardados = min(self.n_guardados + n, self.capacidad)
+
+    def consultar(self, t_inicio: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Devuelve medias, mínimos y máximos en orden cronológico desde t_inicio, incluido el intervalo abierto."""
+        if self.n_guardados < self.capacidad:
+            orden = np.arange(self.n_guardados)
+        else:
+            orden = np.r_[self.siguiente:self.capacidad, 0:self.siguiente]
+        medias = self.medias[orden]
+        minimos = self.minimos[orden]
+        maximos = self.maximos[orden]
+        if self._intervalo is not None:
+            medias = np.vstack((medias, self._suma / self._conteo))
+            minimos = np.vstack((minimos, self._min))
+            maximos = np.vstack((maximos, self._max))
+        desde = np.searchsorted(medias[:, 0], t_inicio)
+        return medias[desde:], minimos[desde:], maximos[desde:]
+
+class Historiador:
+    """Historiador en memoria de toda la sesión con niveles de 1 s, 10 s y 1 min.
+
+    Cada fila almacenada corresponde a [t, y, ysp, co]; los datos crudos recientes
+    siguen viviendo en los deques del simulador.
+    """
+    NIVELES = ((1.0, 7200), (10.0, 8640), (60.0, 10080))
+    MAX_PUNTOS_GRAFICA = 4000
+
+    def __init__(self):
+        self.niveles = [NivelHistorico(ancho, capacidad, 4) for ancho, capacidad in self.NIVELES]
+
+    def agregar(self, datos: np.ndarray) -> None:
+        """Agrega un lote de muestras [t, y, ysp, co] a todos los niveles."""
+        for nivel in self.niveles:
+            nivel.agregar(datos)
+
+    def seleccionar_nivel(self, ventana: float) -> NivelHistorico:
+        """Selecciona el nivel más fino que cubre la ventana sin exceder el máximo de puntos a graficar."""
+        for nivel in self.niveles:
+            if nivel.cobertura >= ventana and ventana / nivel.ancho <= self.MAX_PUNTOS_GRAFICA:
+                return nivel
+        return self.niveles[-1]
+
+    def consultar(self, t_inicio: float, ventana: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Devuelve medias, mínimos y máximos del nivel adecuado para la ventana solicitada."""
+        return self.seleccionar_nivel(ventana).consultar(t_inicio)
+
+class ExportadorDatos:
+    """Escribe columnas NumPy a disco en el formato solicitado reportando el avance."""
+    FORMATOS = ('xlsx', 'csv', 'parquet', 'npz')
+    FILAS_POR_BLOQUE = 20000
+
+    @classmethod
+    def formatos_disponibles(cls) -> tuple[str, ...]:
+        """Formatos utilizables en esta instalación (parquet solo si hay un motor instalado)."""
+        motor_parquet = any(importlib.util.find_spec(motor) is not None for motor in ('pyarrow', 'fastparquet'))
+        return tuple(f for f in cls.FORMATOS if f != 'parquet' or motor_parquet)
+
+    def __init__(self, columnas: dict[str, np.ndarray], reportar_avance: Callable[[float], None]):
+        self.columnas = columnas
+        self.reportar_avance = reportar_avance
+        self.n_filas = len(next(iter(columnas.values())))
+
+    def exportar(self, nombre_archivo: str, formato: str) -> str:
+        """Exporta los datos y devuelve la ruta del archivo generado."""
+        if formato not in self.FORMATOS:
+            raise ValueError(f"Formato de exportado no soportado: {formato}")
+        ruta = f'{nombre_archivo}.{formato}'
+        getattr(self, f'_exportar_{formato}')(ruta)
+        self.reportar_avance(1.0)
+        return ruta
+
+    def _bloques(self):
+        """Recorre los índices de inicio y fin de cada bloque de filas."""
+        for inicio in range(0, self.n_filas, self.FILAS_POR_BLOQUE):
+            yield inicio, min(inicio + self.FILAS_POR_BLOQUE, self.n_filas)
+
+    def _exportar_xlsx(self, ruta: str) -> None:
+        """Exporta a xlsx con el escritor en modo solo escritura de openpyxl (sin mantener celdas en memoria)."""
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet()
+        hoja.append(list(self.columnas))
+        datos = np.column_stack(list(self.columnas.values()))
+        for inicio, fin in self._bloques():
+            for fila in datos[inicio:fin].tolist():
+                hoja.append(fila)
+            self.reportar_avance(0.9 * fin / self.n_filas)
+        libro.save(ruta)
+
+    def _exportar_csv(self, ruta: str) -> None:
+        """Exporta a csv por bloques con separador ';' y coma decimal."""
+        df = DataFrame(self.columnas, copy=False)
+        with open(ruta, 'w', newline='') as archivo:
+            df.iloc[:0].to_csv(archivo, decimal=',', sep=';', index=False)
+            for inicio, fin in self._bloques():
+                df.iloc[inicio:fin].to_csv(archivo, decimal=',', sep=';', index=False, header=False)
+                self.reportar_avance(fin / self.n_filas)
+
+    def _exportar_parquet(self, ruta: str) -> None:
+        """Exporta a Parquet (requiere pyarrow o fastparquet)."""
+        try:
+            DataFrame(self.columnas, copy=False).to_parquet(ruta, index=False)
+        except ImportError as e:
+            raise RuntimeError("El formato parquet requiere instalar pyarrow.") from e
+
+    def _exportar_npz(self, ruta: str) -> None:
+        """Exporta a un archivo .npz de NumPy con un arreglo por columna."""
+        np.savez(ruta, **self.columnas)
+
+class IdentificadorFOPDT:
+    """Identificación de modelos FOPDT (Kp, taup, td) a partir de registros de prueba escalón.
+
+    Ajusta el modelo discreto y[k+1] = a*y[k] + Kp*(1-a)*u[k-d] minimizando el error de simulación:
+    para cada taup (a = exp(-Ts/taup)) evalúa todos los retardos candidatos d en lote y resuelve
+    Kp y el nivel base por mínimos cuadrados; taup se busca en escala logarítmica.
+
+    Las columnas se ubican por nombre: el nombre completo o la primera o última parte de una
+    etiqueta de historiador (p. ej. 'TIC101.PV') debe coincidir con uno de los nombres admitidos.
+    La columna de tiempo puede estar en segundos o contener fechas.
+    """
+    NOMBRES_T = ('t', 'time', 'tiempo', 'timestamp', 'fecha', 'date', 'datetime')
+    NOMBRES_CO = ('co', 'mv', 'op', 'u')
+    NOMBRES_Y = ('y', 'pv')
+    FILAS_POR_BLOQUE = 200000
+    FRACCION_TD_MAX = 0.25
+    AJUSTE_MINIMO = 90.0
+    MUESTRAS_BUSQUEDA = 4000
+    PUNTOS_BUSQUEDA = 40
+    MUESTRAS_POR_TAU = 200
+    MUESTRAS_MINIMAS = 500
+    MUESTRAS_REFINO = 200000
+
+    @classmethod
+    def leer_datos(cls, ruta: str, reportar_avance: Callable[[int], None] = lambda filas: None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Lee las columnas t, CO e y de un archivo csv, xlsx o npz; t en segundos desde la primera muestra."""
+        extension = os.path.splitext(ruta)[1].lower()
+        if extension == '.npz':
+            with np.load(ruta) as datos:
+                i_t, i_co, i_y = cls._indices_columnas(list(datos.files))
+                t, co, y = (cls._segundos(datos[datos.files[i_t]]), np.asarray(datos[datos.files[i_co]], dtype=float),
+                            np.asarray(datos[datos.files[i_y]], dtype=float))
+        elif extension == '.xlsx':
+            t, co, y = cls._leer_xlsx(ruta, reportar_avance)
+        else:
+            t, co, y = cls._leer_csv(ruta, reportar_avance)
+        return t - t[0], co, y
+
+    @classmethod
+    def _indices_columnas(cls, encabezado: list[str]) -> tuple[int, int, int]:
+        """Ubica las columnas de tiempo, CO e y por nombre o por etiqueta de historiador."""
+        nombres = [str(nombre).strip().lower() for nombre in encabezado]
+        partes = [re.split(r'[\s._:/-]+', nombre) for nombre in nombres]
+        indices = []
+        for etiqueta, candidatos in (('tiempo', cls.NOMBRES_T), ('CO', cls.NOMBRES_CO), ('y', cls.NOMBRES_Y)):
+            exactas = [i for i, nombre in enumerate(nombres) if nombre in candidatos]
+            coincidencias = exactas or [i for i, p in enumerate(partes) if p[0] in candidatos or p[-1] in candidatos]
+            if len(coincidencias) != 1:
+                motivo = "No se encontró" if not coincidencias else "Hay más de una"
+                raise ValueError(f"{motivo} columna de {etiqueta} (nombres admitidos: {', '.join(candidatos)}). "
+                                 f"Columnas del archivo: {', '.join(map(str, encabezado))}. "
+                                 f"Renombre las columnas o deje solo las de tiempo, CO e y.")
+            indices.append(coincidencias[0])
+        return tuple(indices)
+
+    @staticmethod
+    def _segundos(valores) -> np.ndarray:
+        """Convierte una columna de tiempo numérica o de fechas a segundos."""
+        valores = np.asarray(valores)
+        if valores.dtype.kind == 'M':
+            return valores.astype('datetime64[ns]').astype(np.int64) / 1e9
+        try:
+            return valores.astype(float)
+        except (ValueError, TypeError):
+            pass
+        try:
+            fechas = to_datetime(valores)
+        except (ValueError, TypeError) as e:
+            raise ValueError("La columna de tiempo no contiene números ni fechas reconocibles.") from e
+        return np.asarray(fechas, dtype='datetime64[ns]').astype(np.int64) / 1e9
+
+    @classmethod
+    def _leer_csv(cls, ruta: str, reportar_avance: Callable[[int], None]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Lee un csv por bloques de filas; detecta el separador (',', ';', tabulador o '|') y los encabezados
+        entre comillas. Con separador ';' se usa coma decimal, como en el formato exportado."""
+        with open(ruta, 'r', encoding='utf-8-sig', newline='') as archivo:
+            muestra = ''.join(islice(archivo, 20))
+        try:
+            separador = csv.Sniffer().sniff(muestra, delimiters=',;\t|').delimiter
+        except csv.Error:
+            separador = ';' if ';' in muestra.partition('\n')[0] else ','
+        encabezado = next(csv.reader([muestra.partition('\n')[0]], delimiter=separador), [])
+        indices = cls._indices_columnas(encabezado)
+        orden = sorted(indices)
+        bloques = []
+        filas = 0
+        lector = read_csv(ruta, sep=separador, decimal=',' if separador == ';' else '.', usecols=indices,
+                          encoding='utf-8-sig', chunksize=cls.FILAS_POR_BLOQUE)
+        with lector:
+            for bloque in lector:
+                columnas = [bloque.iloc[:, orden.index(i)].to_numpy() for i in indices]
+                bloques.append(np.column_stack([cls._segundos(columnas[0]), columnas[1].astype(float), columnas[2].astype(float)]))
+                filas += len(bloque)
+                reportar_avance(filas)
+        if not bloques:
+            raise ValueError("El archivo no contiene datos.")
+        datos = np.concatenate(bloques)
+        return datos[:, 0], datos[:, 1], datos[:, 2]
+
+    @classmethod
+    def _leer_xlsx(cls, ruta: str, reportar_avance: Callable[[int], None]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Lee un xlsx fila a fila con openpyxl en modo solo lectura."""
+        libro = load_workbook(ruta, read_only=True, data_only=True)
+        try:
+            filas = libro.active.iter_rows(values_only=True)
+            indices = cls._indices_columnas(list(next(filas)))
+            bloques = []
+            n_filas = 0
+            while True:
+                bloque = [[fila[i] for i in indices] for fila in islice(filas, cls.FILAS_POR_BLOQUE)]
+                if not bloque:
+                    break
+                t, co, y = zip(*bloque)
+                bloques.append(np.column_stack([cls._segundos(list(t)), np.array(co, dtype=float), np.array(y, dtype=float)]))
+                n_filas += len(bloque)
+                reportar_avance(n_filas)
+        finally:
+            libro.close()
+        if not bloques:
+            raise ValueError("El archivo no contiene datos.")
+        datos = np.concatenate(bloques)
+        return datos[:, 0], datos[:, 1], datos[:, 2]
+
+    @staticmethod
+    def remuestrear(t: np.ndarray, co: np.ndarray, y: np.ndarray) -> tuple[float, np.ndarray, np.ndarray]:
+        """Devuelve el periodo de muestreo y las señales sobre una malla uniforme de tiempo."""
+        validos = np.isfinite(t) & np.isfinite(co) & np.isfinite(y)
+        t, co, y = t[validos], co[validos], y[validos]
+        if len(t) < 10:
+            raise ValueError("Se necesitan al menos 10 muestras válidas para identificar el modelo.")
+        dt = np.diff(t)
+        if np.any(dt <= 0):
+            raise ValueError("La columna de tiempo debe ser estrictamente creciente.")
+        Ts = float(np.median(dt))
+        if np.ptp(dt) <= 1e-6 * Ts:
+            return Ts, co, y
+        t_uniforme = np.arange(t[0], t[-1], Ts)
+        return Ts, np.interp(t_uniforme, t, co), np.interp(t_uniforme, t, y)
+
+    @classmethod
+    def ajustar(cls, t: np.ndarray, co: np.ndarray, y: np.ndarray, td_max: float | None = None) -> tuple[dict[str, float], float]:
+        """Ajusta Kp, taup y td y devuelve una entrada lista para process.yaml junto con el porcentaje de ajuste.
+
+        Minimiza el error de simulación (no el de predicción a un paso, que queda sesgado cuando y
+        tiene ruido de medición). El proceso se supone estable antes del primer cambio de CO, y
+        y0/co0 son las medias de ese tramo. Primero se busca en una versión promediada del registro
+        de MUESTRAS_BUSQUEDA muestras y luego se refina con un periodo de taup/MUESTRAS_POR_TAU
+        (sin superar MUESTRAS_REFINO muestras).
+        """
+        Ts, u, y = cls.remuestrear(t, co, y)
+        N = len(y)
+        if td_max is None:
+            td_max = cls.FRACCION_TD_MAX * N * Ts
+
+        umbral = 0.1 * np.ptp(u)
+        if umbral == 0:
+            raise ValueError("No hay un cambio escalón en CO en los datos.")
+        k_escalon = max(int(np.argmax(np.abs(u - u[0]) > umbral)), 1)
+        y_base = float(y[:k_escalon].mean())
+        u_base = float(u[:k_escalon].mean())
+        yc = y - y_base
+        uc = u - u_base
+
+        # Búsqueda en todo el rango de taup sobre el registro promediado
+        factor = max(N // cls.MUESTRAS_BUSQUEDA, 1)
+        Ts_d, u_d, y_d = cls._promediar(Ts, uc, yc, factor)
+        taup, _ = cls._buscar_taup(Ts_d, u_d, y_d, td_max, Ts_d / 2, N * Ts, cls.PUNTOS_BUSQUEDA)
+
+        # Refinamiento con una resolución de taup/MUESTRAS_POR_TAU alrededor de la primera estimación
+        factor = max(min(int(taup / cls.MUESTRAS_POR_TAU / Ts), N // cls.MUESTRAS_MINIMAS), -(-N // cls.MUESTRAS_REFINO), 1)
+        Ts_d, u_d, y_d = cls._promediar(Ts, uc, yc, factor)
+        taup, _ = cls._buscar_taup(Ts_d, u_d, y_d, td_max, taup / 3, taup * 3, 9)
+
+        # Retardo, parámetros lineales y porcentaje de ajuste a la resolución original
+        a = np.exp(-Ts / taup)
+        _, d = cls._error_simulacion(a, uc, yc, int(min(td_max / Ts, N // 2)))
+        respuesta = cls._respuesta(a, uc, d)
+        A = np.column_stack((np.ones(N), respuesta))
+        (c0, Kp), *_ = np.linalg.lstsq(A, yc, rcond=None)
+        y_modelo = A @ (c0, Kp)
+        ajuste = 100.0 * (1 - np.linalg.norm(yc - y_modelo) / max(np.linalg.norm(yc - yc.mean()), 1e-12))
+
+        params = {
+            'Kp': round(float(Kp), 4),
+            'taup': round(float(taup), 4),
+            'td': round(float(d * Ts), 4),
+            'y0': round(y_base, 4),
+            'ysp0': round(y_base, 4),
+            'co0': round(u_base, 4)
+        }
+        return params, round(float(ajuste), 1)
+
+    @staticmethod
+    def _promediar(Ts: float, u: np.ndarray, y: np.ndarray, factor: int) -> tuple[float, np.ndarray, np.ndarray]:
+        """Filtra y diezma promediando bloques de `factor` muestras."""
+        if factor == 1:
+            return Ts, u, y
+        n = len(y) // factor * factor
+        return Ts * factor, u[:n].reshape(-1, factor).mean(axis=1), y[:n].reshape(-1, factor).mean(axis=1)
+
+    @staticmethod
+    def _respuesta(a: float, u: np.ndarray, d: int) -> np.ndarray:
+        """Respuesta de ganancia unitaria y[k+1] = a*y[k] + (1-a)*u[k-d], con u = 0 antes del registro."""
+        respuesta = np.zeros(len(u))
+        if d < len(u) - 1:
+            respuesta[d + 1:] = lfilter([1 - a], [1.0, -a], u)[:len(u) - d - 1]
+        return respuesta
+
+    @classmethod
+    def _error_simulacion(cls, a: float, u: np.ndarray, y: np.ndarray, D: int) -> tuple[float, int]:
+        """Error cuadrático mínimo de y = c0 + Kp*respuesta(a, d) y su retardo, para todos los d <= D a la vez."""
+        N = len(y)
+        g = cls._respuesta(a, u, 0)
+        d = np.arange(D + 1)
+        acumulada = np.concatenate(([0.0], np.cumsum(g)))
+        acumulada2 = np.concatenate(([0.0], np.cumsum(g * g)))
+        suma_g = acumulada[N - d]
+        suma_g2 = acumulada2[N - d]
+        suma_yg = fftconvolve(y, g[::-1], mode='full')[N - 1:N + D]
+        suma_y = y.sum()
+
+        det = N * suma_g2 - suma_g ** 2
+        validos = det > 1e-12 * max(N * suma_g2[0], 1e-300)
+        Kp = np.where(validos, (N * suma_yg - suma_g * suma_y) / np.where(validos, det, 1.0), 0.0)
+        c0 = (suma_y - Kp * suma_g) / N
+        sse = y @ y - c0 * suma_y - Kp * suma_yg
+        retardo = int(np.argmin(sse))
+        return float(sse[retardo]), retardo
+
+    @classmethod
+    def _buscar_taup(cls, Ts: float, u: np.ndarray, y: np.ndarray, td_max: float,
+                     taup_min: float, taup_max: float, puntos: int) -> tuple[float, int]:
+        """Busca taup en escala logarítmica (malla y luego Brent) minimizando el error de simulación."""
+        D = int(min(td_max / Ts, len(y) // 2))
+
+        def costo(log_taup: float) -> float:
+            return cls._error_simulacion(np.exp(-Ts / np.exp(log_taup)), u, y, D)[0]
+
+        malla = np.linspace(np.log(taup_min), np.log(taup_max), puntos)
+        costos = [costo(x) for x in malla]
+        i = int(np.argmin(costos))
+        resultado = minimize_scalar(costo, bounds=(malla[max(i - 1, 0)], malla[min(i + 1, puntos - 1)]),
+                                    method='bounded', options={'xatol': 1e-4})
+        taup = float(np.exp(resultado.x))
+        return taup, cls._error_simulacion(np.exp(-Ts / taup), u, y, D)[1]
+
+class Perfilador:
+    """Perfilador por muestreo de las pilas de llamadas del hilo de la GUI y del hilo de simulación.
+
+    La captura se guarda en formato de pilas colapsadas ("folded stacks"), que se abre
+    directamente en speedscope o con flamegraph.pl para obtener la gráfica de llama.
+    """
+    HILOS = {'MainThread': 'GUI', 'simulacion': 'simulacion'}
+    INTERVALO_MUESTREO = 0.005
+
+    def __init__(self, hilos: dict[str, str] | None = None):
+        self.hilos = self.HILOS if hilos is None else hilos
+        self.activo = False
+        self.muestras = Counter()
+        self._hilo = None
+        self._detener = threading.Event()
+        self._etiquetas = {}
+
+    def iniciar(self) -> None:
+        """Inicia la captura en un hilo de muestreo independiente."""
+        if self.activo:
+            return
+        self.muestras = Counter()
+        self._detener.clear()
+        self.activo = True
+        self._hilo = threading.Thread(target=self._muestrear, name='perfilador', daemon=True)
+        self._hilo.start()
+        logging.info("Perfilado iniciado.")
+
+    def detener(self, nombre_archivo: str) -> str:
+        """Detiene la captura, la guarda en disco y devuelve la ruta del archivo."""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=2.0)
+            self._hilo = None
+        self.activo = False
+
+        ruta = f'{nombre_archivo}.folded'
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            for pila, conteo in self.muestras.most_common():
+                archivo.write(f'{pila} {conteo}\n')
+        logging.info(f"Perfilado guardado en {ruta} ({sum(self.muestras.values())} muestras)")
+        return ruta
+
+    def _muestrear(self) -> None:
+        """Toma muestras periódicas de las pilas de los hilos de interés."""
+        while not self._detener.wait(self.INTERVALO_MUESTREO):
+            nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                etiqueta_hilo = self.hilos.get(nombres.get(ident))
+                if etiqueta_hilo is not None:
+                    self.muestras[self._pila(etiqueta_hilo, frame)] += 1
+
+    def _pila(self, etiqueta_hilo: str, frame) -> str:
+        """Convierte un frame en una pila colapsada, de la llamada más externa a la más interna."""
+        marcos = []
+        while frame is not None:
+            codigo = frame.f_code
+            etiqueta = self._etiquetas.get(codigo)
+            if etiqueta is None:
+                etiqueta = f'{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})'
+                self._etiquetas[codigo] = etiqueta
+            marcos.append(etiqueta)
+            frame = frame.f_back
+        marcos.append(etiqueta_hilo)
+        return ';'.join(reversed(marcos))
+
 class GUI:
+    VENTANAS_TENDENCIA = {
+        'Tiempo real': None,
+        '10 min': 600.0,
+        '1 h': 3600.0,
+        '8 h': 28800.0,
+        'Sesión': float('inf'),
+    }
+
     def __init__(self, simulador):
         self.simulador = simulador
         self.process_names = simulador.process_names
@@ -164,6 +1150,9 @@ class GUI:
         self.line_y, = self.ax.plot([], [], color='b', label='Y', linestyle='solid')
         self.line_ysp, = self.ax.plot([], [], color='r', label='Ysp', linestyle='dashed')
         self.line_co, = self.twax.plot([], [], color='purple', label='CO', linestyle='solid')
+        # Envolventes mínimo/máximo de los niveles del historiador (solo en ventanas largas)
+        self.banda_y = self.ax.fill_between([], [], [], color='b', alpha=0.25, linewidth=0, visible=False)
+        self.banda_co = self.twax.fill_between([], [], [], color='purple', alpha=0.25, linewidth=0, visible=False)
 
         handles1, labels1 = self.ax.get_legend_handles_labels()
         handles2, labels2 = self.twax.get_legend_handles_labels()
@@ -230,6 +1219,19 @@ class GUI:
         
         self.etiquetaTd, self.entradaTd = self.crear_parametro_input(self.tabview.tab("Simulación"), 'td', 
                                                    self.simulador.td, 4, self.simulador.actualizar_td)
+
+        self.etiquetaPerturbacion, self.entradaPerturbacion = self.crear_parametro_input(self.tabview.tab("Simulación"), 'Perturbación',
+                                                                 0.0, 6, self.simulador.actualizar_perturbacion)
+        topologia = self.simulador.topologia
+        if topologia is not None and topologia.perturbaciones:
+            self.etiquetaPerturbacion.configure(text=f'{topologia.perturbaciones[0]}: ')
+        else:
+            self.etiquetaPerturbacion.grid_remove()
+            self.entradaPerturbacion.grid_remove()
+
+        self.boton_identificar = CTkButton(self.tabview.tab("Simulación"), text='Identificar FOPDT desde datos', width=20,
+                                           command=self.simulador.identificar_proceso)
+        self.boton_identificar.grid(padx=10, pady=10, row=5, column=0, columnspan=3)
         
         CTkLabel(self.tabview.tab("Simulación"), text='Velocidad de simulación:').grid(column=0, row=18)
         
@@ -243,6 +1245,17 @@ class GUI:
                                           variable=self.simularRuido, command=self.simulador.actualizar_estado_ruido)
         self.checkSimularRuido.grid(padx=10, pady=10, row=20, column=0, columnspan=2)
 
+        self.boton_estable = CTkButton(self.tabview.tab("Simulación"), text='Ir a estado estable', width=20,
+                                       command=self.simulador.avanzar_a_estado_estable)
+        self.boton_estable.grid(padx=10, pady=10, row=23, column=0, columnspan=2)
+
+        CTkLabel(self.tabview.tab("Simulación"), text='Ventana de tendencia:').grid(column=0, row=21)
+
+        self.ventanaTendencia = StringVar(value='Tiempo real')
+        self.comboboxVentana = CTkComboBox(self.tabview.tab("Simulación"), values=list(self.VENTANAS_TENDENCIA),
+                                           command=self.simulador.actualizar_ventana_grafica, variable=self.ventanaTendencia)
+        self.comboboxVentana.grid(padx=10, pady=10, row=22, column=0, columnspan=2)
+
     def crear_tab_controlador(self) -> None:
         """Crea los elementos de la pestaña 'Controlador'."""
         _, self.entradaSetPoint = self.crear_parametro_input(self.tabview.tab("Controlador"), 'Set point',
@@ -282,8 +1295,9 @@ class GUI:
 
     def crear_tab_exportado(self) -> None:
         """Crea los elementos de la pestaña 'Exportado'."""
-        CTkButton(self.tabview.tab("Exportado"), text='Exportar', width=20,
-                 command=self.simulador.exportar_datos).grid(column=0, row=4, padx=5, pady=5, columnspan=2)
+        self.boton_exportar = CTkButton(self.tabview.tab("Exportado"), text='Exportar', width=20,
+                                        command=self.simulador.exportar_datos)
+        self.boton_exportar.grid(column=0, row=4, padx=5, pady=5, columnspan=2)
         
         self.formatoExportado = StringVar(value='xlsx')
         CTkLabel(self.tabview.tab("Exportado"), text="Formato de exportado:").grid(row=0, column=0, columnspan=1, padx=10, pady=10, sticky="")
@@ -294,6 +1308,17 @@ class GUI:
         CTkRadioButton(self.tabview.tab("Exportado"), variable=self.formatoExportado, 
                       value='csv', text='csv').grid(row=2, column=1, pady=10, padx=10)
 
+        if 'parquet' in ExportadorDatos.formatos_disponibles():
+            CTkRadioButton(self.tabview.tab("Exportado"), variable=self.formatoExportado,
+                          value='parquet', text='parquet').grid(row=3, column=0, pady=10, padx=10)
+
+        CTkRadioButton(self.tabview.tab("Exportado"), variable=self.formatoExportado,
+                      value='npz', text='npz').grid(row=3, column=1, pady=10, padx=10)
+
+        self.boton_perfilado = CTkButton(self.tabview.tab("Exportado"), text='Iniciar perfilado', width=20,
+                                         command=self.simulador.alternar_perfilado)
+        self.boton_perfilado.grid(column=0, row=5, padx=5, pady=5, columnspan=2)
+
     def crear_parametro_input(self, parent, label, def_value, row, command) -> tuple[CTkLabel, CTkEntry]:
         """Crea un par de Label y Entry para un parámetro de entrada."""
         etiqueta = CTkLabel(parent, text=f'{label}: ')
@@ -315,6 +1340,8 @@ class GUI:
         self.line_y.set_data(t_arr, y_arr)
         self.line_ysp.set_data(t_arr, ysp_arr)
         self.line_co.set_data(t_arr, co_arr)
+        self.banda_y.set_visible(False)
+        self.banda_co.set_visible(False)
 
         if tActual <= tminGrafica:
             new_xlim = (0, tminGrafica)
@@ -326,19 +1353,55 @@ class GUI:
         if np.any(mask):
             y_visible = y_arr[mask]
             ysp_visible = ysp_arr[mask]
-            y_min = min(np.amin(y_visible), np.amin(ysp_visible))
-            y_max = max(np.amax(y_visible), np.amax(ysp_visible), 1)
-            new_ylim = (min(y_min * 0.95, y_min - 1.0), max(y_max * 1.05, y_max + 1.0))
-
             co_visible = co_arr[mask]
-            co_min = np.amin(co_visible)
-            co_max = np.amax(co_visible)
-            new_twylim = (0 if co_min < 0 else co_min * 0.95,
-                          1 if co_max < 1 else co_max * 1.05)
+            new_ylim, new_twylim = self._limites_ejes(min(np.amin(y_visible), np.amin(ysp_visible)),
+                                                      max(np.amax(y_visible), np.amax(ysp_visible)),
+                                                      np.amin(co_visible), np.amax(co_visible))
+        else:
+            new_ylim = (0, 100)
+            new_twylim = (0, 100)
+
+        self._redibujar(new_xlim, new_ylim, new_twylim)
+
+    def actualizar_grafica_historica(self, historiador, tActual, ventana) -> None:
+        """Actualiza la gráfica de tendencia con los agregados del historiador para ventanas largas."""
+        if tActual <= ventana:
+            new_xlim = (0, ventana)
+        else:
+            new_xlim = (tActual - ventana, tActual)
+
+        with self.simulador.data_lock:
+            medias, minimos, maximos = historiador.consultar(new_xlim[0], ventana)
+
+        t_arr = medias[:, 0]
+        self.line_y.set_data(t_arr, medias[:, 1])
+        self.line_ysp.set_data(t_arr, medias[:, 2])
+        self.line_co.set_data(t_arr, medias[:, 3])
+        self.banda_y.set_data(t_arr, minimos[:, 1], maximos[:, 1])
+        self.banda_co.set_data(t_arr, minimos[:, 3], maximos[:, 3])
+        self.banda_y.set_visible(True)
+        self.banda_co.set_visible(True)
+        self.ax.set_xlim(new_xlim)
+
+        if len(t_arr):
+            new_ylim, new_twylim = self._limites_ejes(np.amin(minimos[:, 1:3]), np.amax(maximos[:, 1:3]),
+                                                      np.amin(minimos[:, 3]), np.amax(maximos[:, 3]))
         else:
             new_ylim = (0, 100)
             new_twylim = (0, 100)
 
+        self._redibujar(new_xlim, new_ylim, new_twylim)
+
+    def _limites_ejes(self, y_min, y_max, co_min, co_max) -> tuple[tuple[float, float], tuple[float, float]]:
+        """Calcula los límites de los ejes de y y de CO a partir de los extremos visibles."""
+        y_max = max(y_max, 1)
+        new_ylim = (min(y_min * 0.95, y_min - 1.0), max(y_max * 1.05, y_max + 1.0))
+        new_twylim = (0 if co_min < 0 else co_min * 0.95,
+                      1 if co_max < 1 else co_max * 1.05)
+        return new_ylim, new_twylim
+
+    def _redibujar(self, new_xlim, new_ylim, new_twylim) -> None:
+        """Aplica los límites de los ejes y redibuja el canvas completo o solo las líneas con blitting."""
         axes_changed = (self._xlim_prev != new_xlim or
                         self._ylim_prev != new_ylim or
                         self._twylim_prev != new_twylim)
@@ -354,6 +1417,8 @@ class GUI:
             self._twylim_prev = new_twylim
         else:
             self.canvas.restore_region(self._blit_background)
+            self.ax.draw_artist(self.banda_y)
+            self.twax.draw_artist(self.banda_co)
             self.ax.draw_artist(self.line_y)
             self.ax.draw_artist(self.line_ysp)
             self.twax.draw_artist(self.line_co)
@@ -364,26 +1429,37 @@ class GUI:
         logging.info("Iniciando el loop principal de la interfaz...")
         self.ventana.mainloop()
 
-class SimuladorControlador:
-    def __init__(self):
-        """Inicializa el simulador, carga la configuración y crea la GUI."""
-        logging.info("Inicializando SimuladorControlador...")
+class MotorSimulacion:
+    """Estado y avance de la simulación de un sistema del catálogo, sin interfaz gráfica.
+
+    Es la base de SimuladorControlador (GUI) y de SimuladorSinGUI: ambos avanzan los lazos
+    simples con simulacion_pid (PIDController y fopdt_euler) y las topologías con Topologia.
+    """
+    PASOS_AVANCE_RAPIDO = 1000
+
+    def __init__(self, sistema: str | None = None):
+        """Carga la configuración y el estado de la simulación del sistema indicado (el primero por defecto)."""
         self.configuracion_manager = Configuracion()
         self.configuracion = self.configuracion_manager.configuracion
         self.process_params = self.configuracion_manager.process_params
         self.process_names = self.configuracion_manager.process_names
-        self.sistemaSeleccionado = self.process_names[0]
+        self.sistemaSeleccionado = self.process_names[0] if sistema is None else sistema
+        if self.sistemaSeleccionado not in self.process_params:
+            raise ValueError(f"El sistema '{self.sistemaSeleccionado}' no está en el catálogo de procesos")
         self.estadoSimulacion = False
         self.data_lock = threading.Lock()
         self.data_queue = queue.Queue()
-        self.sim_thread = None
-        self._gui_update_pending = False
+        self.topologia = None
+        self._parametros_sistema = None
         self.inicializar_parametros()
         self.inicializar_parametros_controlador()
         self.inicializar_estado_simulacion()
-        self.gui = GUI(self)
-        logging.info("SimuladorControlador inicializado exitosamente.")
-    
+
+    def _reportar_error(self, mensaje: str) -> None:
+        """Registra un error de configuración y lo lanza como ValueError."""
+        logging.error(mensaje)
+        raise ValueError(mensaje)
+
     def inicializar_parametros(self) -> None:
         """Inicializa los parámetros de simulación a partir de la configuración cargada."""
         logging.info("Inicializando parámetros de simulación...")
@@ -393,13 +1469,19 @@ class SimuladorControlador:
             self.Ts = self.configuracion['Ts']
             self.controlAutomaticoEncendido = self.configuracion['controlAutomaticoEncendido']
             self.tminGrafica = self.configuracion['tminGrafica']
-            self.Kp = self.process_params[self.sistemaSeleccionado]['Kp']
-            self.taup = self.process_params[self.sistemaSeleccionado]['taup']
-            self.td = self.process_params[self.sistemaSeleccionado]['td']
+            params = self.parametros_sistema()
+            if 'topologia' in params:
+                self.topologia = Topologia(params['topologia'], self.Ts)
+                self.topologia.fijar_modo(self.controlAutomaticoEncendido)
+                self.Kp, self.taup, self.td = self.topologia.parametros_principales()
+            else:
+                self.topologia = None
+                self.Kp = params['Kp']
+                self.taup = params['taup']
+                self.td = params['td']
             logging.info("Parámetros de simulación inicializados exitosamente.")
         except KeyError as e:
-            logging.error(f"Error al inicializar parámetros de la simulación: Falta la clave {e} en el archivo de configuración.")
-            showerror("Error", f"Error al inicializar parámetros de la simulación: Falta la clave {e} en el archivo de configuración.")
+            self._reportar_error(f"Error al inicializar parámetros de la simulación: Falta la clave {e} en el archivo de configuración.")
     
     def inicializar_parametros_controlador(self) -> None:
         """Inicializa los parámetros del controlador a partir de la configuración cargada."""
@@ -416,8 +1498,7 @@ class SimuladorControlador:
             self.controller.set_controller_status(self.controlAutomaticoEncendido)
             logging.info("Parámetros del controlador inicializados exitosamente.")
         except KeyError as e:
-            logging.error(f"Error al inicializar parámetros del controlador: Falta la clave {e} en el archivo de configuración.")
-            showerror("Error", f"Error al inicializar parámetros del controlador: Falta la clave {e} en el archivo de configuración.")
+            self._reportar_error(f"Error al inicializar parámetros del controlador: Falta la clave {e} en el archivo de configuración.")
 
     def inicializar_estado_simulacion(self) -> None:
         """Inicializa las variables de estado de la simulación."""
@@ -425,9 +1506,15 @@ class SimuladorControlador:
         try:
             self.tstep = 0
             self.tActual = 0
-            self.yActual = self.process_params[self.sistemaSeleccionado]['y0']
-            self.coActual = self.process_params[self.sistemaSeleccionado]['co0']
-            self.yspActual = self.process_params[self.sistemaSeleccionado]['ysp0']
+            if self.topologia is not None:
+                self.topologia.reiniciar()
+                self.topologia.fijar_modo(self.controlAutomaticoEncendido)
+                self.yActual, self.yspActual, self.coActual = self.topologia.valores_grafica()
+            else:
+                params = self.parametros_sistema()
+                self.yActual = params['y0']
+                self.coActual = params['co0']
+                self.yspActual = params['ysp0']
             self.ruidoSenalEncendido = self.configuracion['ruidoSenalEncendido']
             self.t0 = self.tActual
             self.y0 = self.yActual
@@ -440,10 +1527,131 @@ class SimuladorControlador:
             self.ysp = deque([self.yspActual], maxlen=n_datos_max)
             self.nDatosGrafica = round(self.tminGrafica / self.Ts)
             self.n_datos_max = n_datos_max
+            self.historiador = Historiador()
+            self.historiador.agregar(np.array([[self.tActual, self.yActual, self.yspActual, self.coActual]], dtype=float))
             logging.info("Variables de estado de simulación inicializadas exitosamente.")
         except KeyError as e:
-            logging.error(f"Error al inicializar variables de estado: Falta la clave {e} en el archivo de configuración.")
-            showerror("Error", f"Error al inicializar variables de estado: Falta la clave {e} en el archivo de configuración.")
+            self._reportar_error(f"Error al inicializar variables de estado: Falta la clave {e} en el archivo de configuración.")
+
+    def parametros_sistema(self) -> dict[str, Any]:
+        """Parámetros del sistema seleccionado; si una recarga lo quitó del catálogo, los últimos usados."""
+        if self.sistemaSeleccionado in self.process_params:
+            self._parametros_sistema = self.process_params[self.sistemaSeleccionado]
+        elif self._parametros_sistema is None:
+            raise KeyError(self.sistemaSeleccionado)
+        return self._parametros_sistema
+
+    def fopdt(self, t: float, y_prev: float, co: float) -> float:
+        """Define la ecuación diferencial del modelo FOPDT."""
+        u = 0 if t < self.td + self.tstep else 1
+        dydt = -(y_prev - self.y0) / self.taup + self.Kp / self.taup * u * (co - self.co0)
+        return dydt
+    
+    def fopdt_euler(self, t: float, y_prev: float, co: float) -> float:
+        """Resuelve un paso del modelo FOPDT usando la solución analítica exacta."""
+        u = 0 if t < self.td + self.tstep else 1
+        y_eq = self.y0 + self.Kp * u * (co - self.co0)
+        y_next = y_eq + (y_prev - y_eq) * np.exp(-self.Ts / self.taup)
+        return y_next
+
+    def solve_system(self, t: float, y_prev: float, co: float) -> float:
+        """Resuelve la ecuación representativa del sistema y entrega la predicción de la respuesta."""
+
+        y_next = self.fopdt_euler(t, y_prev, co)
+
+        return y_next
+    
+    def simulacion_pid(self, n_pasos: int | None = None) -> None:
+        """Ejecuta un lote de pasos de simulación (tVel por defecto) y envía datos a la queue."""
+        try:
+            n_pasos = self.tVel if n_pasos is None else n_pasos
+            if self.topologia is not None:
+                self._simulacion_topologia(n_pasos)
+                return
+            nuevos = np.empty((n_pasos, 4))
+            for i in range(n_pasos):
+                with self.data_lock:
+                    self.tActual = self.t[-1] + self.Ts
+                    self.t.append(self.tActual)
+                    self.ysp.append(self.yspActual)
+                    
+                    if self.td <= self.Ts:
+                        coAtrasado = self.co[-1]
+                    else:
+                        offset = int(self.td / self.Ts)
+                        coAtrasado = self.co[-offset] if len(self.co) > offset else self.co0
+                    
+                    y_next = self.solve_system(self.tActual, self.y[-1], coAtrasado)
+                    y_next *= np.random.normal(1, np.sqrt(self.variance * self.ruidoSenalEncendido))
+                    self.y.append(y_next)
+                    
+                    nuevoCO = self.controller.calculate_CO(self.y[-1], self.ysp[-1], self.co[-1] if self.controlAutomaticoEncendido else self.coActual)
+                    self.co.append(nuevoCO)
+                    nuevos[i] = (self.tActual, y_next, self.ysp[-1], nuevoCO)
+
+            with self.data_lock:
+                self.historiador.agregar(nuevos)
+            self.data_queue.put(('update', None))
+        except Exception as e:
+            self.estadoSimulacion = False
+            self.data_queue.put(('error', str(e)))
+
+    def _simulacion_topologia(self, n_pasos: int) -> None:
+        """Ejecuta un lote de pasos de la topología y agrega las señales graficadas a los buffers."""
+        with self.data_lock:
+            datos = self.topologia.avanzar(n_pasos, self.variance * self.ruidoSenalEncendido)
+            nuevos = datos[:, self.topologia.indices_grafica]
+            self.t.extend(nuevos[:, 0].tolist())
+            self.y.extend(nuevos[:, 1].tolist())
+            self.ysp.extend(nuevos[:, 2].tolist())
+            self.co.extend(nuevos[:, 3].tolist())
+            self.tActual = self.t[-1]
+            self.historiador.agregar(nuevos)
+        self.data_queue.put(('update', None))
+
+class SimuladorControlador(MotorSimulacion):
+    TOLERANCIA_ESTABLE = 5e-3
+    TOLERANCIA_ESTABLE_CO = 1e-2
+    SEGMENTOS_ESTABLE = 10
+    TAUS_MAX_AVANCE = 50
+    INTERVALO_VIGILANCIA_MS = 1000
+
+    def __init__(self):
+        """Inicializa el simulador, carga la configuración y crea la GUI."""
+        logging.info("Inicializando SimuladorControlador...")
+        super().__init__()
+        self.export_queue = queue.Queue()
+        self.exportacionEnCurso = False
+        self.perfilador = Perfilador()
+        self.identificacion_queue = queue.Queue()
+        self.identificacionEnCurso = False
+        self.sim_thread = None
+        self._gui_update_pending = False
+        self.ventanaGrafica = None
+        self.avanceRapido = False
+        self.gui = GUI(self)
+        self.reestablecer_topologia_gui()
+        if self.configuracion_manager.error_procesos:
+            showerror("Error", f"No se pudo cargar el catálogo de procesos; el archivo no se modificó.\n\n"
+                               f"{self.configuracion_manager.error_procesos}")
+        self.gui.ventana.after(self.INTERVALO_VIGILANCIA_MS, self._vigilar_catalogo)
+        logging.info("SimuladorControlador inicializado exitosamente.")
+
+    def _reportar_error(self, mensaje: str) -> None:
+        """Registra el error y lo muestra en un diálogo."""
+        logging.error(mensaje)
+        showerror("Error", mensaje)
+
+    def _vigilar_catalogo(self) -> None:
+        """Recarga el catálogo si process.yaml cambió y actualiza comboboxSistema sin tocar la simulación en curso."""
+        if self.process_params.recargar_si_cambio():
+            self.gui.comboboxSistema.configure(values=self.process_names)
+            self.gui.labelStatus.configure(text=f'Catálogo recargado ({len(self.process_names)} procesos)')
+            if self.sistemaSeleccionado not in self.process_params:
+                logging.warning(f"El proceso '{self.sistemaSeleccionado}' ya no está en el catálogo; se conserva su modelo actual.")
+                self.gui.labelStatus.configure(text=f"'{self.sistemaSeleccionado}' ya no está en el catálogo; "
+                                                    f"se conserva su modelo hasta cambiar de sistema")
+        self.gui.ventana.after(self.INTERVALO_VIGILANCIA_MS, self._vigilar_catalogo)
 
     def reestablecer_entradas_proceso_gui(self) -> None:
         """Reestablece los textos en los campos de entrada del proceso"""
@@ -490,6 +1698,29 @@ class SimuladorControlador:
             self.gui.entradaKp.grid_remove()
             self.gui.entradaTaup.grid_remove()
             self.gui.entradaTd.grid_remove()
+
+        self.reestablecer_topologia_gui()
+
+    def reestablecer_topologia_gui(self) -> None:
+        """Muestra la perturbación medida y las ganancias del controlador activo (el principal si el sistema es una topología)"""
+        if self.topologia is not None and self.topologia.perturbaciones:
+            self.gui.etiquetaPerturbacion.configure(text=f'{self.topologia.perturbaciones[0]}: ')
+            self.gui.entradaPerturbacion.delete(0, "end")
+            self.gui.entradaPerturbacion.insert(0, str(self.topologia.d[0]))
+            self.gui.etiquetaPerturbacion.grid()
+            self.gui.entradaPerturbacion.grid()
+        else:
+            self.gui.etiquetaPerturbacion.grid_remove()
+            self.gui.entradaPerturbacion.grid_remove()
+
+        if self.topologia is not None:
+            i = self.topologia.i_sp
+            ganancias = (float(self.topologia.Kc[i]), float(self.topologia.Ki[i]), float(self.topologia.Kd[i]))
+        else:
+            ganancias = (self.Kc, self.Ki, self.Kd)
+        for entrada, valor in zip((self.gui.entradaKc, self.gui.entradaKi, self.gui.entradaKd), ganancias):
+            entrada.delete(0, "end")
+            entrada.insert(0, str(valor))
     
     #  TODO Pendiente adicionar el typing
     def _actualizar_parametro_gui(self, entrada_gui, nombre_parametro, tipo_dato, callback_actualizar, event=None)  -> None:
@@ -549,6 +1780,9 @@ class SimuladorControlador:
         """Actualiza el valor del set point (ysp) basado en la entrada del usuario."""
         try:
             self.yspActual = float(self.gui.entradaSetPoint.get())
+            if self.topologia is not None:
+                with self.data_lock:
+                    self.topologia.fijar_sp(self.yspActual)
             self.tstep = self.tActual
             self.co0 = self.co[-1]
             self.y0 = self.y[-1]
@@ -558,26 +1792,34 @@ class SimuladorControlador:
             self.gui.entradaSetPoint.insert(0, str(self.yspActual))
 
     def actualizar_ganancias(self, event=None) -> None:
-        """Actualiza las ganancias del controlador (Kc, Ki, Kd) basado en la entrada del usuario."""
+        """Actualiza las ganancias del controlador (Kc, Ki, Kd) basado en la entrada del usuario.
+
+        En una topología solo cambian las del controlador principal, que no se guardan en config.yaml.
+        """
         try:
-            self.Kc = float(self.gui.entradaKc.get())
-            self.Ki = float(self.gui.entradaKi.get())
-            self.Kd = float(self.gui.entradaKd.get())
-            self.cambiosParametros = True
-            self.controller.set_controller_gains(self.Kc, self.Ki, self.Kd)
+            Kc = float(self.gui.entradaKc.get())
+            Ki = float(self.gui.entradaKi.get())
+            Kd = float(self.gui.entradaKd.get())
         except ValueError:
             showerror("Error", "Ingrese valores numéricos válidos para Kc, Ki y Kd.")
-            self.gui.entradaKc.delete(0, "end")
-            self.gui.entradaKc.insert(0, str(self.Kc))
-            self.gui.entradaKi.delete(0, "end")
-            self.gui.entradaKi.insert(0, str(self.Ki))
-            self.gui.entradaKd.delete(0, "end")
-            self.gui.entradaKd.insert(0, str(self.Kd))
+            self.reestablecer_topologia_gui()
+            return
+
+        if self.topologia is not None:
+            with self.data_lock:
+                self.topologia.fijar_ganancias(Kc, Ki, Kd)
+            return
+        self.Kc, self.Ki, self.Kd = Kc, Ki, Kd
+        self.cambiosParametros = True
+        self.controller.set_controller_gains(self.Kc, self.Ki, self.Kd)
 
     def actualizar_estado_control(self) -> None:
         """Actualiza el estado del control automático (encendido/apagado)."""
         self.controlAutomaticoEncendido = self.gui.controlAutomatico.get()
         self.controller.set_controller_status(self.controlAutomaticoEncendido)
+        if self.topologia is not None:
+            with self.data_lock:
+                self.topologia.fijar_modo(self.controlAutomaticoEncendido)
         
         if self.controlAutomaticoEncendido:
             self.gui.labelCO.grid_forget()
@@ -593,6 +1835,9 @@ class SimuladorControlador:
         """Actualiza el valor de CO (Control Output) basado en la entrada del usuario."""
         try:
             self.coActual = float(self.gui.entradaCO.get())
+            if self.topologia is not None:
+                with self.data_lock:
+                    self.topologia.fijar_co(self.coActual)
             self.tstep = self.tActual
             self.co0 = self.co[-1]
             self.y0 = self.y[-1]
@@ -601,6 +1846,20 @@ class SimuladorControlador:
             self.gui.entradaCO.delete(0, "end")
             self.gui.entradaCO.insert(0, str(self.coActual))
 
+    def actualizar_perturbacion(self, event=None) -> None:
+        """Actualiza el valor de la perturbación medida de la topología basado en la entrada del usuario."""
+        if self.topologia is None or not self.topologia.perturbaciones:
+            return
+        try:
+            valor = float(self.gui.entradaPerturbacion.get())
+            with self.data_lock:
+                self.topologia.fijar_perturbacion(self.topologia.perturbaciones[0], valor)
+            self.tstep = self.tActual
+        except ValueError:
+            showerror("Error", "Ingrese un valor numérico válido para la perturbación.")
+            self.gui.entradaPerturbacion.delete(0, "end")
+            self.gui.entradaPerturbacion.insert(0, str(self.topologia.d[0]))
+
     def actualizar_velocidad(self, event=None) -> None:
         """Actualiza la velocidad de simulación basada en el valor del slider."""
         nuevaVelocidad = round(self.gui.scaleVelocidad.get(), -1)
@@ -615,6 +1874,12 @@ class SimuladorControlador:
         """Actualiza el estado de la simulación de ruido (encendido/apagado)."""
         self.ruidoSenalEncendido = self.gui.simularRuido.get()
 
+    def actualizar_ventana_grafica(self, event=None) -> None:
+        """Actualiza la ventana de tiempo mostrada en la gráfica de tendencia."""
+        self.ventanaGrafica = self.gui.VENTANAS_TENDENCIA[self.gui.ventanaTendencia.get()]
+        if not self.estadoSimulacion:
+            self.refrescar_grafica()
+
     def actualizar_estado_antiwindup(self) -> None:
         """Actualizar el estaod del corrector anti-windip"""
         self.estadoAntiwindup = self.gui.estadoAntiwindup.get()
@@ -637,7 +1902,7 @@ class SimuladorControlador:
             self.gui.entradaTd.configure(state='disabled')
             self.gui.comboboxSistema.configure(state='disabled')
             
-            self.sim_thread = threading.Thread(target=self._simulacion_loop, daemon=True)
+            self.sim_thread = threading.Thread(target=self._simulacion_loop, name='simulacion', daemon=True)
             self.sim_thread.start()
             self._gui_update_pending = False
             self._programar_consumo_datos()
@@ -652,6 +1917,9 @@ class SimuladorControlador:
     def detener_simulacion(self) -> None:
         logging.info("Deteniendo simulación...")
         self.estadoSimulacion = False
+        if self.avanceRapido:
+            self.avanceRapido = False
+            self.gui.boton_estable.configure(state='normal')
         if self.sim_thread is not None:
             self.sim_thread.join(timeout=2.0)
             self.sim_thread = None
@@ -669,122 +1937,305 @@ class SimuladorControlador:
             self.inicializar_estado_simulacion()
             self.reestablecer_entradas_proceso_gui()
             self.controller.restart_controller()
-            self.gui.actualizar_grafica(self.t, self.y, self.ysp, self.co, self.tActual, self.tminGrafica)
+            self.refrescar_grafica()
             logging.info("Simulación reiniciada exitosamente.")
     
-    def fopdt(self, t: float, y_prev: float, co: float) -> float:
-        """Define la ecuación diferencial del modelo FOPDT."""
-        u = 0 if t < self.td + self.tstep else 1
-        dydt = -(y_prev - self.y0) / self.taup + self.Kp / self.taup * u * (co - self.co0)
-        return dydt
-    
-    def fopdt_euler(self, t: float, y_prev: float, co: float) -> float:
-        """Resuelve un paso del modelo FOPDT usando la solución analítica exacta."""
-        u = 0 if t < self.td + self.tstep else 1
-        y_eq = self.y0 + self.Kp * u * (co - self.co0)
-        y_next = y_eq + (y_prev - y_eq) * np.exp(-self.Ts / self.taup)
-        return y_next
-
-    def solve_system(self, t: float, y_prev: float, co: float) -> float:
-        """Resuelve la ecuación representativa del sistema y entrega la predicción de la respuesta."""
-
-        y_next = self.fopdt_euler(t, y_prev, co)
-
-        return y_next
-    
-    def simulacion_pid(self) -> None:
-        """Ejecuta un lote de pasos de simulación y envía datos a la queue."""
-        try:
-            for i in range(self.tVel):
-                with self.data_lock:
-                    self.tActual = self.t[-1] + self.Ts
-                    self.t.append(self.tActual)
-                    self.ysp.append(self.yspActual)
-                    
-                    if self.td <= self.Ts:
-                        coAtrasado = self.co[-1]
-                    else:
-                        offset = int(self.td / self.Ts)
-                        coAtrasado = self.co[-offset] if len(self.co) > offset else self.co0
-                    
-                    y_next = self.solve_system(self.tActual, self.y[-1], coAtrasado)
-                    y_next *= np.random.normal(1, np.sqrt(self.variance * self.ruidoSenalEncendido))
-                    self.y.append(y_next)
-                    
-                    nuevoCO = self.controller.calculate_CO(self.y[-1], self.ysp[-1], self.co[-1] if self.controlAutomaticoEncendido else self.coActual)
-                    self.co.append(nuevoCO)
-            
-            self.data_queue.put(('update', None))
-        except Exception as e:
-            self.estadoSimulacion = False
-            self.data_queue.put(('error', str(e)))
-
     def _simulacion_loop(self) -> None:
         """Loop de simulación que se ejecuta en un hilo separado."""
         while self.estadoSimulacion:
+            if self.avanceRapido:
+                self._paso_avance_rapido()
+                continue
             t_start = datetime.datetime.now()
             self.simulacion_pid()
             elapsed = (datetime.datetime.now() - t_start).total_seconds()
             sleep_time = max(0.05, 0.1 - elapsed)
             threading.Event().wait(sleep_time)
 
+    def avanzar_a_estado_estable(self) -> None:
+        """Ejecuta la simulación a máxima velocidad hasta que y y CO se estabilizan."""
+        if not self.estadoSimulacion:
+            self.iniciar_simulacion()
+            if not self.estadoSimulacion:
+                return
+        self._t_inicio_avance = self.tActual
+        self.avanceRapido = True
+        self.gui.boton_estable.configure(state='disabled')
+        self.gui.labelStatus.configure(text='Avanzando a estado estable...')
+        logging.info("Avance rápido a estado estable iniciado.")
+
+    def _paso_avance_rapido(self) -> None:
+        """Ejecuta un lote del avance rápido y lo termina al detectar el estado estable o agotar el tiempo máximo."""
+        try:
+            if self._puede_saltar_analitico():
+                self._saltar_analitico()
+            else:
+                self.simulacion_pid(self.PASOS_AVANCE_RAPIDO)
+
+            if self._en_estado_estable():
+                self.avanceRapido = False
+                self.data_queue.put(('avance_rapido', True))
+            elif self.tActual - self._t_inicio_avance > self.TAUS_MAX_AVANCE * (self.taup + self.td):
+                self.avanceRapido = False
+                self.data_queue.put(('avance_rapido', False))
+        except Exception as e:
+            self.avanceRapido = False
+            self.estadoSimulacion = False
+            self.data_queue.put(('error', str(e)))
+
+    def _banda_estable(self, valores: np.ndarray, banda: float) -> bool:
+        """Indica si las medias por segmento de la ventana quedan dentro de la banda de tolerancia."""
+        medias = np.array([segmento.mean() for segmento in np.array_split(valores, self.SEGMENTOS_ESTABLE)])
+        return np.ptp(medias) <= banda
+
+    def _en_estado_estable(self) -> bool:
+        """Evalúa si y y CO permanecen dentro de la banda de tolerancia durante una constante de tiempo."""
+        with self.data_lock:
+            n_ventana = min(max(round(self.taup / self.Ts), 2 * self.SEGMENTOS_ESTABLE), len(self.y) - 1)
+            if n_ventana < 2 * self.SEGMENTOS_ESTABLE or self.tActual - self.tstep < self.td + n_ventana * self.Ts:
+                return False
+            y_ventana = np.fromiter(islice(reversed(self.y), n_ventana), dtype=float, count=n_ventana)
+            co_ventana = np.fromiter(islice(reversed(self.co), n_ventana), dtype=float, count=n_ventana)
+        return (self._banda_estable(y_ventana, self.TOLERANCIA_ESTABLE * max(abs(y_ventana.mean()), 1.0)) and
+                self._banda_estable(co_ventana, self.TOLERANCIA_ESTABLE_CO * (self.CO_MAX - self.CO_MIN)))
+
+    def _puede_saltar_analitico(self) -> bool:
+        """En modo manual con CO constante en toda la línea de retardo, la respuesta tiene solución cerrada."""
+        if self.topologia is not None or self.controlAutomaticoEncendido or self.tActual < self.tstep + self.td:
+            return False
+        with self.data_lock:
+            n_retardo = max(int(self.td / self.Ts), 1) + 1
+            if len(self.co) < n_retardo:
+                return False
+            co_retardo = np.fromiter(islice(reversed(self.co), n_retardo), dtype=float, count=n_retardo)
+        return np.ptp(co_retardo) == 0 and co_retardo[0] == self.coActual
+
+    def _saltar_analitico(self) -> None:
+        """Genera de una vez la respuesta FOPDT exacta hasta entrar en la banda de estado estable."""
+        with self.data_lock:
+            co_constante = self.co[-1]
+            y_prev = self.y[-1]
+            y_eq = self.y0 + self.Kp * (co_constante - self.co0)
+            tolerancia = self.TOLERANCIA_ESTABLE * max(abs(y_eq), 1.0)
+            n_pasos = round(self.taup / self.Ts)
+            if abs(y_prev - y_eq) > tolerancia:
+                n_pasos += math.ceil(self.taup / self.Ts * math.log(abs(y_prev - y_eq) / tolerancia))
+            n_pasos = min(n_pasos, round(self.TAUS_MAX_AVANCE * (self.taup + self.td) / self.Ts))
+
+            k = np.arange(1, n_pasos + 1)
+            t_nuevos = self.t[-1] + k * self.Ts
+            y_nuevos = y_eq + (y_prev - y_eq) * np.exp(-k * self.Ts / self.taup)
+            y_nuevos *= np.random.normal(1, np.sqrt(self.variance * self.ruidoSenalEncendido), n_pasos)
+            co_nuevos = np.full(n_pasos, co_constante)
+            co_nuevos[-1] = self.controller.calculate_CO(y_nuevos[-1], self.yspActual, self.coActual)
+
+            self.t.extend(t_nuevos.tolist())
+            self.y.extend(y_nuevos.tolist())
+            self.ysp.extend([self.yspActual] * n_pasos)
+            self.co.extend(co_nuevos.tolist())
+            self.tActual = self.t[-1]
+            self.historiador.agregar(np.column_stack((t_nuevos, y_nuevos, np.full(n_pasos, self.yspActual), co_nuevos)))
+        self.data_queue.put(('update', None))
+
+    def _finalizar_avance_rapido(self, estable: bool) -> None:
+        """Informa el resultado del avance rápido y reactiva el botón (hilo GUI)."""
+        self.gui.boton_estable.configure(state='normal')
+        if estable:
+            self.gui.labelStatus.configure(text=f'Estado estable en t = {self.tActual:.1f} s')
+            logging.info(f"Estado estable alcanzado en t = {self.tActual:.1f} s")
+        else:
+            self.gui.labelStatus.configure(text='No se alcanzó el estado estable')
+            logging.warning(f"No se alcanzó el estado estable en t = {self.tActual:.1f} s")
+
     def _programar_consumo_datos(self) -> None:
         """Programa la verificación periódica de datos desde la queue en el hilo GUI."""
         if not self.estadoSimulacion:
             return
 
-        if not self.data_queue.empty():
-            msg_type, msg_data = self.data_queue.get_nowait()
+        while not self.data_queue.empty():
+            try:
+                msg_type, msg_data = self.data_queue.get_nowait()
+            except queue.Empty:
+                break
             if msg_type == 'error':
                 self.estadoSimulacion = False
                 showerror("Error", f"Error durante la simulación: {msg_data}")
                 return
+            if msg_type == 'avance_rapido':
+                self._finalizar_avance_rapido(msg_data)
             if not self._gui_update_pending:
                 self._gui_update_pending = True
                 self.gui.ventana.after_idle(self._consumir_y_actualizar)
 
-        while not self.data_queue.empty():
-            try:
-                self.data_queue.get_nowait()
-            except queue.Empty:
-                break
-
         self.gui.ventana.after(50, self._programar_consumo_datos)
 
     def _consumir_y_actualizar(self) -> None:
         """Actualiza la gráfica con los datos actuales (se ejecuta en el hilo GUI)."""
         self._gui_update_pending = False
         if self.estadoSimulacion:
+            self.refrescar_grafica()
+
+    def refrescar_grafica(self) -> None:
+        """Redibuja la tendencia desde los datos crudos o, para ventanas largas, desde el historiador."""
+        if self.ventanaGrafica is None or self.ventanaGrafica <= self.tminGrafica:
             self.gui.actualizar_grafica(self.t, self.y, self.ysp, self.co, self.tActual, self.tminGrafica)
+        else:
+            ventana = min(self.ventanaGrafica, max(self.tActual, self.tminGrafica))
+            self.gui.actualizar_grafica_historica(self.historiador, self.tActual, ventana)
     
     def exportar_datos(self) -> None:
-        """Exporta los datos de la simulación a un archivo csv o xlsx"""
+        """Lanza en segundo plano el exportado de los datos de la simulación al formato seleccionado."""
+        if self.exportacionEnCurso:
+            return
+
         ahora = datetime.datetime.now()
         nombreArchivo = ahora.strftime("data_%Y-%m-%d_%H_%M_%S")
-        
-        datos = {
-            't': list(self.t),
-            'CO': list(self.co),
-            'y': list(self.y),
-            'ysp': list(self.ysp)
-        }
-        
-        df = DataFrame(datos)
         formato = self.gui.formatoExportado.get()
-        
-        if formato == 'xlsx':
-            df.to_excel(nombreArchivo + '.xlsx', index=False)
-        elif formato == 'csv':
-            df.to_csv(nombreArchivo + '.csv', decimal=',', sep=';', index=False)
-        
-        self.gui.labelStatus.configure(text=f'Exportado {ahora}')
-        logging.info(f"Datos exportados a {nombreArchivo}.{formato}")
+
+        with self.data_lock:
+            n = len(self.t)
+            datos = {
+                't': np.fromiter(self.t, dtype=float, count=n),
+                'CO': np.fromiter(self.co, dtype=float, count=n),
+                'y': np.fromiter(self.y, dtype=float, count=n),
+                'ysp': np.fromiter(self.ysp, dtype=float, count=n)
+            }
+
+        self.exportacionEnCurso = True
+        self.gui.boton_exportar.configure(state='disabled')
+        self.gui.labelStatus.configure(text='Exportando... 0%')
+        threading.Thread(target=self._exportar_en_segundo_plano, args=(datos, nombreArchivo, formato), daemon=True).start()
+        self._programar_consumo_exportado()
+
+    def _exportar_en_segundo_plano(self, datos: dict[str, np.ndarray], nombreArchivo: str, formato: str) -> None:
+        """Escribe el archivo de exportado en un hilo separado y envía el avance a la queue."""
+        try:
+            exportador = ExportadorDatos(datos, lambda avance: self.export_queue.put(('progreso', avance)))
+            ruta = exportador.exportar(nombreArchivo, formato)
+            self.export_queue.put(('fin', ruta))
+        except Exception as e:
+            self.export_queue.put(('error', str(e)))
+
+    def _programar_consumo_exportado(self) -> None:
+        """Consume los mensajes del exportado en curso y muestra el avance en labelStatus (hilo GUI)."""
+        while not self.export_queue.empty():
+            msg_type, msg_data = self.export_queue.get_nowait()
+            if msg_type == 'progreso':
+                self.gui.labelStatus.configure(text=f'Exportando... {msg_data:.0%}')
+            elif msg_type == 'fin':
+                self.exportacionEnCurso = False
+                self.gui.labelStatus.configure(text=f'Exportado {os.path.basename(msg_data)}')
+                logging.info(f"Datos exportados a {msg_data}")
+            elif msg_type == 'error':
+                self.exportacionEnCurso = False
+                self.gui.labelStatus.configure(text='Error al exportar')
+                logging.error(f"Error al exportar datos: {msg_data}")
+                showerror("Error", f"Error al exportar datos: {msg_data}")
+
+        if self.exportacionEnCurso:
+            self.gui.ventana.after(100, self._programar_consumo_exportado)
+        else:
+            self.gui.boton_exportar.configure(state='normal')
     
+    def identificar_proceso(self) -> None:
+        """Selecciona un registro de prueba escalón y lanza en segundo plano la identificación del modelo FOPDT."""
+        if self.identificacionEnCurso:
+            return
+
+        ruta = askopenfilename(title='Datos de prueba escalón',
+                               filetypes=[('Datos', '*.csv *.xlsx *.npz'), ('Todos los archivos', '*.*')])
+        if not ruta:
+            return
+
+        self.identificacionEnCurso = True
+        self.gui.boton_identificar.configure(state='disabled')
+        self.gui.labelStatus.configure(text='Leyendo datos...')
+        threading.Thread(target=self._identificar_en_segundo_plano, args=(ruta,), daemon=True).start()
+        self._programar_consumo_identificacion()
+
+    def _identificar_en_segundo_plano(self, ruta: str) -> None:
+        """Lee el archivo y ajusta el modelo en un hilo separado, enviando el avance a la queue."""
+        try:
+            t, co, y = IdentificadorFOPDT.leer_datos(ruta, lambda filas: self.identificacion_queue.put(('progreso', filas)))
+            params, ajuste = IdentificadorFOPDT.ajustar(t, co, y)
+            self.identificacion_queue.put(('fin', (ruta, params, ajuste)))
+        except Exception as e:
+            self.identificacion_queue.put(('error', str(e)))
+
+    def _programar_consumo_identificacion(self) -> None:
+        """Consume los mensajes de la identificación en curso y agrega el modelo al catálogo (hilo GUI)."""
+        while not self.identificacion_queue.empty():
+            msg_type, msg_data = self.identificacion_queue.get_nowait()
+            if msg_type == 'progreso':
+                self.gui.labelStatus.configure(text=f'Leyendo datos... {msg_data} filas')
+            elif msg_type == 'fin':
+                self.identificacionEnCurso = False
+                self._agregar_proceso_identificado(*msg_data)
+            elif msg_type == 'error':
+                self.identificacionEnCurso = False
+                self.gui.labelStatus.configure(text='Error al identificar')
+                logging.error(f"Error al identificar el proceso: {msg_data}")
+                showerror("Error", f"Error al identificar el proceso: {msg_data}")
+
+        if self.identificacionEnCurso:
+            self.gui.ventana.after(100, self._programar_consumo_identificacion)
+        else:
+            self.gui.boton_identificar.configure(state='normal')
+
+    def _agregar_proceso_identificado(self, ruta: str, params: dict[str, float], ajuste: float) -> None:
+        """Pide un nombre para el modelo identificado y lo agrega a process.yaml y a la lista de sistemas."""
+        logging.info(f"Modelo identificado desde {ruta}: {params} (ajuste {ajuste} %)")
+        aviso = ""
+        if ajuste < IdentificadorFOPDT.AJUSTE_MINIMO:
+            logging.warning(f"El modelo identificado reproduce mal los datos (ajuste {ajuste} %).")
+            aviso = "\nAjuste bajo: revise los datos antes de guardar el modelo.\n"
+        nombre_defecto = f"Identificado {os.path.splitext(os.path.basename(ruta))[0]}"
+        dialogo = CTkInputDialog(title='Simulador de Lazos de Control by OF',
+                                 text=f"Kp = {params['Kp']}, Tau = {params['taup']}, td = {params['td']}\n"
+                                      f"Ajuste = {ajuste} %\n{aviso}\n"
+                                      f"Nombre del proceso (vacío: '{nombre_defecto}'):")
+        nombre = dialogo.get_input()
+        if nombre is None:
+            self.gui.labelStatus.configure(text='Identificación descartada')
+            return
+
+        try:
+            self.configuracion_manager.agregar_proceso(nombre.strip() or nombre_defecto, params)
+        except (ValueError, OSError) as e:
+            logging.error(f"Error al agregar el proceso identificado: {e}")
+            showerror("Error", f"Error al agregar el proceso identificado: {e}")
+            return
+
+        self.gui.comboboxSistema.configure(values=self.process_names)
+        self.gui.labelStatus.configure(text=f"Identificado: Kp={params['Kp']}, Tau={params['taup']}, td={params['td']}")
+
+    def alternar_perfilado(self) -> None:
+        """Inicia o detiene la captura de perfilado según su estado actual."""
+        if self.perfilador.activo:
+            self.detener_perfilado()
+        else:
+            self.iniciar_perfilado()
+
+    def iniciar_perfilado(self) -> None:
+        """Inicia la captura de perfilado de la sesión en curso."""
+        self.perfilador.iniciar()
+        self.gui.boton_perfilado.configure(text='Detener perfilado', fg_color='red')
+        self.gui.labelStatus.configure(text='Perfilando...')
+
+    def detener_perfilado(self) -> None:
+        """Detiene la captura de perfilado y la guarda en un archivo de pilas colapsadas."""
+        nombreArchivo = datetime.datetime.now().strftime("perfil_%Y-%m-%d_%H_%M_%S")
+        ruta = self.perfilador.detener(nombreArchivo)
+        self.gui.boton_perfilado.configure(text='Iniciar perfilado', fg_color=self.gui.boton_exportar.cget('fg_color'))
+        self.gui.labelStatus.configure(text=f'Perfil guardado {os.path.basename(ruta)}')
+
     def finalizar_aplicacion(self) -> None:
         """Finaliza la aplicación preguntando al usuario."""
         logging.info("Finalizando aplicación...")
         if askyesno(message='¿Desea salir del simulador?', title='Simulador de Lazos de Control by OF'):
             self.estadoSimulacion = False
+            if self.perfilador.activo:
+                self.detener_perfilado()
 
             new_config = {
                 "variance": self.variance,
@@ -808,3 +2259,56 @@ class SimuladorControlador:
     def ejecutar(self) -> None:
         """Inicia el loop principal de la interfaz gráfica."""
         self.gui.ejecutar()
+
+class SimuladorSinGUI(MotorSimulacion):
+    """Simula un sistema del catálogo sin interfaz gráfica y exporta todas sus señales.
+
+    Usa los mismos motores que la GUI: los lazos simples avanzan con simulacion_pid (PIDController
+    y fopdt_euler) y las topologías con Topologia, de modo que una misma entrada del catálogo
+    produce las mismas trayectorias en ambos modos.
+    """
+
+    def __init__(self, sistema: str | None = None):
+        logging.info("Inicializando SimuladorSinGUI...")
+        super().__init__(sistema)
+
+    def ejecutar(self, duracion: float, formato: str = 'npz', perfilar: bool = False) -> str:
+        """Simula la duración indicada (en segundos) y devuelve la ruta del archivo exportado."""
+        perfilador = Perfilador({'MainThread': 'simulacion'})
+        if perfilar:
+            perfilador.iniciar()
+
+        n_pasos = round(duracion / self.Ts)
+        logging.info(f"Simulando '{self.sistemaSeleccionado}' durante {duracion} s ({n_pasos} pasos)...")
+        if self.topologia is not None:
+            datos = np.vstack((self.topologia.estado_actual(),
+                               self.topologia.avanzar(n_pasos, self.variance * self.ruidoSenalEncendido)))
+            columnas = dict(zip(self.topologia.columnas, datos.T))
+        else:
+            columnas = self._simular_lazo_simple(n_pasos)
+
+        ahora = datetime.datetime.now()
+        if perfilar:
+            perfilador.detener(ahora.strftime("perfil_%Y-%m-%d_%H_%M_%S"))
+        exportador = ExportadorDatos(columnas, lambda avance: None)
+        ruta = exportador.exportar(ahora.strftime("data_%Y-%m-%d_%H_%M_%S"), formato)
+        logging.info(f"Datos exportados a {ruta}")
+        return ruta
+
+    def _simular_lazo_simple(self, n_pasos: int) -> dict[str, np.ndarray]:
+        """Avanza un lazo simple por lotes con simulacion_pid y acumula las señales completas."""
+        buffers = {'t': self.t, 'CO': self.co, 'y': self.y, 'ysp': self.ysp}
+        bloques = [np.array([[buffer[-1] for buffer in buffers.values()]])]
+        self.estadoSimulacion = True
+        restantes = n_pasos
+        while restantes > 0:
+            lote = min(self.PASOS_AVANCE_RAPIDO, self.n_datos_max, restantes)
+            self.simulacion_pid(lote)
+            while not self.data_queue.empty():
+                msg_type, msg_data = self.data_queue.get_nowait()
+                if msg_type == 'error':
+                    raise RuntimeError(f"Error en la simulación: {msg_data}")
+            bloques.append(np.column_stack([list(islice(buffer, len(buffer) - lote, None)) for buffer in buffers.values()]))
+            restantes -= lote
+        datos = np.vstack(bloques)
+        return dict(zip(buffers, datos.T))